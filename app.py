@@ -1,25 +1,17 @@
 import streamlit as st
-from PIL import Image
-import sys
-import os
+from pathlib import Path
 
-# Add the src directory to the Python path
-root_dir = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(root_dir, 'src')
-sys.path.append(src_dir)
-
-# Now import your page modules
 from src.pages import data_input, solve, results, help_page
 
-# Set up logging
+# Logging is configured in src/log_config.py (level set by the BRICKS_LOG environment variable)
 import logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
-# LOGO_PATH = "images/flowsquircle_curbar.png"
-LOGO_PATH = "images/flowsquircle_darkmode_transparent.png"
-LOGO_AND_NAME_PATH = "images/flowsquircle_name.png"
+IMAGES_DIR = Path(__file__).resolve().parent / "images"
+# LOGO_PATH = str(IMAGES_DIR / "flowsquircle_curbar.png")
+LOGO_PATH = str(IMAGES_DIR / "flowsquircle_darkmode_transparent.png")
+LOGO_AND_NAME_PATH = str(IMAGES_DIR / "flowsquircle_name.png")
 
 
 def main():
@@ -8,33 +8,28 @@ This module contains the main function to run the school scheduling process end-
 import sys
 import os
 import time
-import logging
+from concurrent.futures import ProcessPoolExecutor
 
-# Ensure the 'src' directory is added to the system path
-sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
 
 from src.scheduler import Scheduler
 from src import utils
 from src.log_config import logger
 from src.scheduler_utils import run_scheduler
 
-import psutil
 
-
-def log_memory_usage():
-    process = psutil.Process(os.getpid())
-    mem_info = process.memory_info()
-    logger.info(f"Memory usage: {mem_info.rss / 1024 / 1024:.2f} MB")
+def save_plot(plot_func, args, filepath):
+    """Build a figure with one of the `utils` plotting functions, save it, and free it."""
+    fig = plot_func(*args)
+    fig.savefig(filepath)
+    plt.close(fig)
 
 
 def main():
 
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    output_dir = os.path.join(current_dir, 'output')
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Configure logging
-    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    utils.OUTPUT_DIR.mkdir(exist_ok=True)
 
     # Set up data files
     data_files = {
@@ -55,63 +50,59 @@ def main():
 
         logger.info("Running scheduler")
         start_time = time.time()
-        log_memory_usage()
-        schedule = run_scheduler(scheduler, weights, timeout=300)  # 5 minutes timeout
+        with utils.sample_memory_usage():
+            schedule = run_scheduler(scheduler, weights, timeout=300, num_workers=os.cpu_count())  # 5 minutes timeout
         end_time = time.time()
-        log_memory_usage()
 
         if schedule is not None:
             logger.info(f"Schedule generated successfully in {end_time - start_time:.2f} seconds!")
 
-            # Print schedule
-            for day, classes in schedule.items():
-                print(f"Day {day + 1}:")
-                for class_ in classes:
-                    print(f"  Period {class_['period'] + 1}: {class_['class']} - "
-                          f"Teacher: {class_['teacher']}, Room: {class_['room']}")
-                print()
+            # Print schedule (only when someone is watching; it can run to thousands of lines)
+            if sys.stdout.isatty() or os.getenv("VERBOSE"):
+                lines = []
+                for day, classes in schedule.items():
+                    lines.append(f"Day {day + 1}:")
+                    lines.extend(f"  Period {class_['period'] + 1}: {class_['class']} - "
+                                 f"Teacher: {class_['teacher']}, Room: {class_['room']}" for class_ in classes)
+                    lines.append("")
+                sys.stdout.write("\n".join(lines) + "\n")
+
+            # Calculate analytics and statistics in one pass over the schedule
+            analytics = utils.compute_all_analytics(schedule, scheduler.data["teachers"], scheduler.data["classes"],
+                                                    scheduler.data["rooms"], scheduler.data["time_slots"])
 
-            # Calculate and print statistics
-            stats = utils.calculate_schedule_statistics(schedule)
             print("Schedule Statistics:")
-            for key, value in stats.items():
+            for key, value in analytics.statistics.items():
                 print(f"  {key}: {value}")
 
             # Export schedule to CSV
             utils.export_schedule_to_csv(schedule, "generated_schedule.csv")
             print("Schedule exported to output/generated_schedule.csv")
 
-            # Generate and save all visualizations
-            fig = utils.visualize_teacher_workload(schedule)
-            fig.savefig(os.path.join(output_dir, "teacher_workload.png"))
-            print("Teacher workload visualization saved to output/teacher_workload.png")
-
-            teacher_utilization = utils.calculate_teacher_utilization(schedule, scheduler.data["teachers"],
-                                                                      scheduler.data["time_slots"])
-            fig = utils.plot_teacher_utilization(teacher_utilization)
-            fig.savefig(os.path.join(output_dir, "teacher_utilization.png"))
-            print("Teacher utilization plot saved to output/teacher_utilization.png")
-
-            class_distribution = utils.analyze_class_distribution(schedule, scheduler.data["teachers"])
-            fig = utils.plot_class_distribution(class_distribution)
-            fig.savefig(os.path.join(output_dir, "class_distribution.png"))
-            print("Class distribution plot saved to output/class_distribution.png")
-
-            teacher_gaps = utils.analyze_gaps(schedule, scheduler.data["teachers"])
-            fig = utils.plot_teacher_gaps(teacher_gaps)
-            fig.savefig(os.path.join(output_dir, "teacher_gaps.png"))
-            print("Teacher gaps plot saved to output/teacher_gaps.png")
-
-            room_utilization = utils.calculate_room_utilization(schedule, scheduler.data["rooms"],
-                                                                scheduler.data["time_slots"])
-            fig = utils.plot_room_utilization(room_utilization)
-            fig.savefig(os.path.join(output_dir, "room_utilization.png"))
-            print("Room utilization plot saved to output/room_utilization.png")
-
-            subject_balance = utils.analyze_subject_balance(schedule, scheduler.data["classes"])
-            fig = utils.plot_subject_balance(subject_balance)
-            fig.savefig(os.path.join(output_dir, "subject_balance.png"))
-            print("Subject balance plot saved to output/subject_balance.png")
+            teacher_utilization = analytics.teacher_utilization
+            class_distribution = analytics.class_distribution
+            teacher_gaps = analytics.teacher_gaps
+            room_utilization = analytics.room_utilization
+            subject_balance = analytics.subject_balance
+
+            # Generate and save all visualizations in parallel (matplotlib is not thread-safe, so use processes)
+            plots = [
+                (utils.plot_teacher_workload, (analytics.teacher_workload,), "teacher_workload.png",
+                 "Teacher workload visualization"),
+                (utils.plot_teacher_utilization, (teacher_utilization,), "teacher_utilization.png",
+                 "Teacher utilization plot"),
+                (utils.plot_class_distribution, (class_distribution,), "class_distribution.png",
+                 "Class distribution plot"),
+                (utils.plot_teacher_gaps, (teacher_gaps,), "teacher_gaps.png", "Teacher gaps plot"),
+                (utils.plot_room_utilization, (room_utilization,), "room_utilization.png", "Room utilization plot"),
+                (utils.plot_subject_balance, (subject_balance,), "subject_balance.png", "Subject balance plot"),
+            ]
+            with ProcessPoolExecutor(max_workers=min(len(plots), os.cpu_count() or 1)) as executor:
+                futures = [executor.submit(save_plot, plot_func, args, utils.OUTPUT_DIR / filename)
+                           for plot_func, args, filename, _ in plots]
+                for future, (_, _, filename, description) in zip(futures, plots):
+                    future.result()
+                    print(f"{description} saved to output/{filename}")
 
             # Print additional statistics
             print("Teacher Utilization:", teacher_utilization)
@@ -4,194 +4,138 @@
 This module contains functions to implement constraints for the school scheduling problem.
 """
 
-from ortools.linear_solver import pywraplp
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass, field
+from ortools.sat.python import cp_model
 from typing import Dict, List, Any, Tuple
 
 
-def room_capacity_constraint(
-    solver: pywraplp.Solver,
-    x: Dict[Tuple[str, str, str, Tuple[int, int]], pywraplp.Variable],
-    classes: List[Dict[str, Any]],
-    rooms: List[Dict[str, Any]],
-    time_slots: List[Tuple[int, int]],
-    teachers: List[Dict[str, Any]]  # Add teachers as a parameter
-) -> List[pywraplp.Constraint]:
+@dataclass
+class VariableIndex:
     """
-    Ensure that room capacity is not exceeded for any time slot.
-
-    Args:
-        solver: The OR-Tools solver instance
-        x: Decision variables representing the schedule
-        classes: List of class dictionaries
-        rooms: List of room dictionaries
-        time_slots: List of time slot tuples
-        teachers: List of teacher dictionaries
+    Decision variables grouped by the axes the constraints sum over, so that each constraint is a single sum over
+    the variables that actually exist.
 
-    Returns:
-        List of room capacity constraints
+    Attributes:
+        by_teacher_ts: (teacher ID, time slot) -> variables
+        by_class: class ID -> variables
+        by_class_ts: (class ID, time slot) -> variables
     """
-    constraints = []
-    for r in rooms:
-        for ts in time_slots:
-            constraint = solver.Constraint(0, r["Capacity"])
-            for c in classes:
-                for t in teachers:  # Iterate over all teachers
-                    constraint.SetCoefficient(x.get((t["ID"], c["ID"], r["ID"], ts), 0), c["NumStudents"])
-            constraints.append(constraint)
-    return constraints
+    by_teacher_ts: Dict[Tuple[str, Tuple[int, int]], List[cp_model.IntVar]] = field(
+        default_factory=lambda: defaultdict(list))
+    by_class: Dict[str, List[cp_model.IntVar]] = field(default_factory=lambda: defaultdict(list))
+    by_class_ts: Dict[Tuple[str, Tuple[int, int]], List[cp_model.IntVar]] = field(
+        default_factory=lambda: defaultdict(list))
 
 
-def teacher_availability_constraint(
-        solver: pywraplp.Solver,
-        x: Dict[Tuple[str, str, str, Tuple[int, int]], pywraplp.Variable],
-        teachers: List[Dict[str, Any]],
-        classes: List[Dict[str, Any]],
-        rooms: List[Dict[str, Any]],
-        time_slots: List[Tuple[int, int]]
-) -> List[pywraplp.Constraint]:
+def one_class_per_teacher_per_period(
+    model: cp_model.CpModel,
+    index: VariableIndex
+) -> List[cp_model.Constraint]:
     """
-    Ensure that teachers are only scheduled when they are available.
+    Ensure that each teacher is assigned to at most one class per time slot.
 
     Args:
-        solver: The OR-Tools solver instance
-        x: Decision variables representing the schedule
-        teachers: List of teacher dictionaries
-        classes: List of class dictionaries
-        rooms: List of room dictionaries
-        time_slots: List of time slot tuples
+        model: The CP-SAT model
+        index: Decision variables grouped by constraint axis
 
     Returns:
-        List of teacher availability constraints
+        List of constraints
     """
-    constraints = []
-    for t in teachers:
-        for ts in time_slots:
-            day, period = ts
-            if day >= len(t["Availability"]) or period >= len(t["Availability"][day]):
-                print(f"Warning: Availability data missing for teacher {t['ID']} at time slot {ts}")
-                continue
-
-            if not t["Availability"][day][period]:  # If teacher is not available
-                constraint = solver.Constraint(0, 0)
-                for c in classes:
-                    for r in rooms:
-                        constraint.SetCoefficient(x.get((t["ID"], c["ID"], r["ID"], ts), 0), 1)
-                constraints.append(constraint)
-    return constraints
+    # For each teacher and time slot, at most one assignment can be made
+    return [model.AddAtMostOne(variables) for variables in index.by_teacher_ts.values()]
 
 
-def one_class_per_teacher_per_period(
-    solver: pywraplp.Solver,
-    x: Dict[tuple, pywraplp.Variable],
-    teachers: List[Dict[str, Any]],
-    classes: List[Dict[str, Any]],
-    rooms: List[Dict[str, Any]],
-    time_slots: List[tuple]
-) -> List[pywraplp.Constraint]:
+def required_periods_per_class(
+    model: cp_model.CpModel,
+    index: VariableIndex,
+    classes: List[Dict[str, Any]]
+) -> List[cp_model.Constraint]:
     """
-    Ensure that each teacher is assigned to at most one class per time slot.
+    Ensure that each class is scheduled for the required number of periods per week.
 
     Args:
-        solver: The OR-Tools solver instance
-        x: Decision variables representing the schedule
-        teachers: List of teacher dictionaries
+        model: The CP-SAT model
+        index: Decision variables grouped by constraint axis
         classes: List of class dictionaries
-        rooms: List of room dictionaries
-        time_slots: List of time slot tuples
 
     Returns:
         List of constraints
     """
     constraints = []
-    for t in teachers:
-        for ts in time_slots:
-            # For each teacher and time slot, sum of assignments must be <= 1
-            constraint = solver.Constraint(0, 1)
-            for c in classes:
-                for r in rooms:
-                    constraint.SetCoefficient(x[t["ID"], c["ID"], r["ID"], ts], 1)
-            constraints.append(constraint)
+    for c in classes:
+        # For each class, sum of assignments must equal required periods (infeasible if the class has no variables)
+        constraint = model.Add(cp_model.LinearExpr.Sum(index.by_class.get(c["ID"], [])) == c["PeriodsPerWeek"])
+        constraints.append(constraint)
     return constraints
 
 
-def required_periods_per_class(
-    solver: pywraplp.Solver,
-    x: Dict[tuple, pywraplp.Variable],
+def rooms_per_period(
+    model: cp_model.CpModel,
+    index: VariableIndex,
     classes: List[Dict[str, Any]],
-    teachers: List[Dict[str, Any]],
-    rooms: List[Dict[str, Any]],
-    time_slots: List[tuple]
-) -> List[pywraplp.Constraint]:
+    rooms: List[Dict[str, Any]]
+) -> List[cp_model.Constraint]:
     """
-    Ensure that each class is scheduled for the required number of periods per week.
+    Ensure that the classes in each time slot can all be given different rooms big enough for them.
+
+    Rooms only differ by capacity, so this holds exactly when, for every class size, there are no more classes
+    of at least that size than rooms that hold them. Rooms are then assigned after solving, by
+    `heuristics.assign_rooms`, instead of being a dimension of the decision variables.
 
     Args:
-        solver: The OR-Tools solver instance
-        x: Decision variables representing the schedule
+        model: The CP-SAT model
+        index: Decision variables grouped by constraint axis
         classes: List of class dictionaries
-        teachers: List of teacher dictionaries
         rooms: List of room dictionaries
-        time_slots: List of time slot tuples
 
     Returns:
         List of constraints
     """
-    constraints = []
+    capacities = sorted(r["Capacity"] for r in rooms)
+    class_ids_by_size = defaultdict(list)
     for c in classes:
-        # For each class, sum of assignments must equal required periods
-        constraint = solver.Constraint(c["PeriodsPerWeek"], c["PeriodsPerWeek"])
-        for t in teachers:
-            for r in rooms:
-                for ts in time_slots:
-                    constraint.SetCoefficient(x[t["ID"], c["ID"], r["ID"], ts], 1)
-        constraints.append(constraint)
-    return constraints
+        class_ids_by_size[c["NumStudents"]].append(c["ID"])
+    sizes = sorted(class_ids_by_size, reverse=True)
+    rooms_fitting = {size: len(capacities) - bisect_left(capacities, size) for size in sizes}
+    # A size's constraint is implied by the next smaller size's when both have the same number of rooms
+    binding_sizes = {size for size, smaller in zip(sizes, sizes[1:]) if rooms_fitting[size] < rooms_fitting[smaller]}
+    binding_sizes.update(sizes[-1:])
 
-
-def one_class_per_room_per_period(
-    solver: pywraplp.Solver,
-    x: Dict[Tuple[str, str, str, Tuple[int, int]], pywraplp.Variable],
-    teachers: List[Dict[str, Any]],
-    classes: List[Dict[str, Any]],
-    rooms: List[Dict[str, Any]],
-    time_slots: List[Tuple[int, int]]
-) -> List[pywraplp.Constraint]:
-    """
-    Ensure that each room is assigned to at most one class per time slot.
-    """
     constraints = []
-    for r in rooms:
-        for ts in time_slots:
-            constraint = solver.Constraint(0, 1)
-            for t in teachers:
-                for c in classes:
-                    constraint.SetCoefficient(x.get((t["ID"], c["ID"], r["ID"], ts), 0), 1)
-            constraints.append(constraint)
+    for ts in sorted({ts for _, ts in index.by_class_ts}):
+        variables = []  # Variables of the classes of at least the current size in this time slot
+        for size in sizes:
+            for class_id in class_ids_by_size[size]:
+                variables.extend(index.by_class_ts.get((class_id, ts), []))
+            if size in binding_sizes and len(variables) > rooms_fitting[size]:
+                constraints.append(model.Add(cp_model.LinearExpr.Sum(variables) <= rooms_fitting[size]))
     return constraints
 
 
 def apply_all_constraints(
-    solver: pywraplp.Solver,
-    x: Dict[Tuple[str, str, str, Tuple[int, int]], pywraplp.Variable],
-    teachers: List[Dict[str, Any]],
+    model: cp_model.CpModel,
+    index: VariableIndex,
     classes: List[Dict[str, Any]],
-    rooms: List[Dict[str, Any]],
-    time_slots: List[Tuple[int, int]]
-) -> List[pywraplp.Constraint]:
+    rooms: List[Dict[str, Any]]
+) -> List[cp_model.Constraint]:
     """
-    Apply all defined constraints to the solver.
+    Apply all defined constraints to the model.
     """
     all_constraints = []
-    all_constraints.extend(room_capacity_constraint(solver, x, classes, rooms, time_slots, teachers))
-    all_constraints.extend(teacher_availability_constraint(solver, x, teachers, classes, rooms, time_slots))
-    all_constraints.extend(one_class_per_teacher_per_period(solver, x, teachers, classes, rooms, time_slots))
-    all_constraints.extend(required_periods_per_class(solver, x, classes, teachers, rooms, time_slots))
-    all_constraints.extend(one_class_per_room_per_period(solver, x, teachers, classes, rooms, time_slots))
+    all_constraints.extend(one_class_per_teacher_per_period(model, index))
+    all_constraints.extend(required_periods_per_class(model, index, classes))
+    all_constraints.extend(rooms_per_period(model, index, classes, rooms))
     return all_constraints
 
 
 # Note: The decision variable x is assumed to be structured as:
-# x[teacher_id, class_id, room_id, time_slot] = 1 if the assignment is made, 0 otherwise
+# x[teacher_id, class_id, time_slot] = 1 if the assignment is made, 0 otherwise
+# Variables only exist for feasible assignments (the teacher teaches the subject and is available in the time
+# slot, and some room is big enough for the class), so constraints must treat a missing key as an assignment fixed
+# to 0. Rooms are not part of the variables: rooms_per_period keeps each time slot's classes within the rooms
+# available, and rooms are assigned to the solved schedule afterwards.
 
 # Additional constraints you might consider:
 # - Ensuring specific classes are in appropriate room types (e.g., science classes in labs)
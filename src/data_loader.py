@@ -5,33 +5,49 @@ This module provides functions to load data from CSV files into suitable data st
 for the school scheduling problem.
 """
 
-import csv
 from typing import List, Dict, Any, Union
 from io import TextIOWrapper, BytesIO
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
+import numpy as np
+import pandas as pd
+
+from . import log_config  # noqa: F401 (configures logging)
+
 logger = logging.getLogger(__name__)
 
+# Schedule dimensions assumed by the availability data
+NUM_DAYS = 5
+NUM_PERIODS = 8
+
+# Column types for each input CSV. Only these columns are read.
+TEACHER_DTYPES = {"ID": str, "Name": str, "Subjects": str, "FullTime": str, "Availability": str}
+CLASS_DTYPES = {"ID": str, "Subject": str, "GradeLevel": "int64", "NumStudents": "int64", "PeriodsPerWeek": "int64"}
+ROOM_DTYPES = {"ID": str, "Capacity": "int64", "Type": str}
+TIME_SLOT_DTYPES = {"Day": "int64", "Period": "int64"}
 
-def ensure_text_mode(file: Union[str, BytesIO, TextIOWrapper]) -> TextIOWrapper:
+
+def read_csv(file: Union[str, BytesIO, TextIOWrapper], dtypes: Dict[str, Any]) -> pd.DataFrame:
     """
-    Ensure the file is opened in text mode.
+    Read a CSV file into a DataFrame with fixed column types.
+
+    Paths and binary buffers are parsed with the pyarrow engine; text-mode files fall back to the C engine,
+    which pyarrow cannot read from.
 
     Args:
         file (Union[str, BytesIO, TextIOWrapper]): The file object or path.
+        dtypes (Dict[str, Any]): Mapping of the columns to read to their types.
 
     Returns:
-        TextIOWrapper: A file object in text mode.
+        pd.DataFrame: The parsed data.
     """
-    if isinstance(file, str):
-        return open(file, newline="", encoding="utf-8")
-    elif isinstance(file, BytesIO):
-        return TextIOWrapper(file, encoding="utf-8")
+    if isinstance(file, (str, BytesIO)):
+        engine = "pyarrow"
     elif isinstance(file, TextIOWrapper):
-        return file
+        engine = "c"
     else:
         raise ValueError("Unsupported file type")
+    return pd.read_csv(file, engine=engine, dtype=dtypes, usecols=list(dtypes), keep_default_na=False)
 
 
 def load_teachers(file: Union[str, BytesIO, TextIOWrapper]) -> List[Dict[str, Any]]:
@@ -44,21 +60,24 @@ def load_teachers(file: Union[str, BytesIO, TextIOWrapper]) -> List[Dict[str, An
     Returns:
         List[Dict[str, Any]]: List of teacher dictionaries.
     """
-    teachers = []
     logger.debug(f"Starting to load teachers from {file}")
     try:
-        with ensure_text_mode(file) as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                logger.debug(f"Processing row: {row}")
-                teacher = {
-                    "ID": row["ID"],
-                    "Name": row["Name"],
-                    "Subjects": row["Subjects"].split(","),
-                    "FullTime": row["FullTime"].lower() == "true",
-                    "Availability": parse_availability(row["Availability"], num_days=5, num_periods=8)
-                }
-                teachers.append(teacher)
+        df = read_csv(file, TEACHER_DTYPES)
+        availability = parse_availability_array(df["Availability"], num_days=NUM_DAYS, num_periods=NUM_PERIODS)
+        avail_bits = pack_availability(availability)
+        teachers = [
+            {
+                "ID": teacher_id,
+                "Name": name,
+                "Subjects": subjects,
+                "FullTime": full_time,
+                "Availability": teacher_availability,
+                "AvailBits": bits
+            }
+            for teacher_id, name, subjects, full_time, teacher_availability, bits in zip(
+                df["ID"], df["Name"], df["Subjects"].str.split(","), df["FullTime"].str.lower() == "true",
+                availability, avail_bits)
+        ]
         logger.debug(f"Successfully loaded {len(teachers)} teachers")
     except Exception as e:
         logger.error(f"Error loading teachers: {str(e)}")
@@ -76,21 +95,9 @@ def load_classes(file: Union[str, BytesIO, TextIOWrapper]) -> List[Dict[str, Any
     Returns:
         List[Dict[str, Any]]: List of class dictionaries.
     """
-    classes = []
     logger.debug(f"Starting to load classes from {file}")
     try:
-        with ensure_text_mode(file) as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                logger.debug(f"Processing row: {row}")
-                class_ = {
-                    "ID": row["ID"],
-                    "Subject": row["Subject"],
-                    "GradeLevel": int(row["GradeLevel"]),
-                    "NumStudents": int(row["NumStudents"]),
-                    "PeriodsPerWeek": int(row["PeriodsPerWeek"])
-                }
-                classes.append(class_)
+        classes = read_csv(file, CLASS_DTYPES).to_dict("records")
         logger.debug(f"Successfully loaded {len(classes)} classes")
     except Exception as e:
         logger.error(f"Error loading classes: {str(e)}")
@@ -108,19 +115,9 @@ def load_rooms(file: Union[str, BytesIO, TextIOWrapper]) -> List[Dict[str, Any]]
     Returns:
         List[Dict[str, Any]]: List of room dictionaries.
     """
-    rooms = []
     logger.debug(f"Starting to load rooms from {file}")
     try:
-        with ensure_text_mode(file) as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                logger.debug(f"Processing row: {row}")
-                room = {
-                    "ID": row["ID"],
-                    "Capacity": int(row["Capacity"]),
-                    "Type": row["Type"]
-                }
-                rooms.append(room)
+        rooms = read_csv(file, ROOM_DTYPES).to_dict("records")
         logger.debug(f"Successfully loaded {len(rooms)} rooms")
     except Exception as e:
         logger.error(f"Error loading rooms: {str(e)}")
@@ -138,15 +135,10 @@ def load_time_slots(file: Union[str, BytesIO, TextIOWrapper]) -> List[tuple]:
     Returns:
         List[tuple]: List of time slot tuples.
     """
-    time_slots = []
     logger.debug(f"Starting to load time slots from {file}")
     try:
-        with ensure_text_mode(file) as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                logger.debug(f"Processing row: {row}")
-                time_slot = (int(row["Day"]), int(row["Period"]))
-                time_slots.append(time_slot)
+        df = read_csv(file, TIME_SLOT_DTYPES)
+        time_slots = list(zip(df["Day"].tolist(), df["Period"].tolist()))
         logger.debug(f"Successfully loaded {len(time_slots)} time slots")
     except Exception as e:
         logger.error(f"Error loading time slots: {str(e)}")
@@ -154,9 +146,13 @@ def load_time_slots(file: Union[str, BytesIO, TextIOWrapper]) -> List[tuple]:
     return time_slots
 
 
-def parse_availability(availability_str: str, num_days: int = 5, num_periods: int = 8) -> List[List[bool]]:
+def parse_availability(availability_str: str, num_days: int = 5, num_periods: int = 8) -> np.ndarray:
     """
-    Parse the availability string into a 2D list of booleans.
+    Parse the availability string into a 2D boolean array.
+
+    Days are separated by ";" and periods by ","; a slot is available if its field, stripped of whitespace, is "1".
+    Days or periods missing from the string are unavailable; extra ones are ignored. `parse_availability_array`
+    parses whole columns with the same rules.
 
     Args:
         availability_str (str): String representation of availability.
@@ -164,35 +160,100 @@ def parse_availability(availability_str: str, num_days: int = 5, num_periods: in
         num_periods (int): Number of periods per day.
 
     Returns:
-        List[List[bool]]: 2D list representing availability for each day and period.
+        np.ndarray: Boolean array of shape (num_days, num_periods) representing availability.
     """
-    logger.debug(f"Parsing availability string: {availability_str}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug(f"Parsing availability string: {availability_str}")
+    slots = bytearray(num_days * num_periods)  # One 0/1 byte per slot, viewed as the bool array at the end
     try:
-        days = availability_str.split(";")
-        availability = []
-        for day in days:
-            periods = day.split(",")
-            day_availability = [slot == "1" for slot in periods]
-            # Ensure each day has the correct number of periods
-            day_availability += [False] * (num_periods - len(day_availability))
-            availability.append(day_availability)
-
-        # Ensure the correct number of days
-        while len(availability) < num_days:
-            availability.append([False] * num_periods)
-
-        logger.debug(f"Parsed availability: {availability}")
+        for day, day_str in enumerate(availability_str.split(";")[:num_days]):
+            # Compare each comma-separated field, stripped, with "1", so empty or padded fields keep their position
+            for period, period_str in enumerate(day_str.split(",")[:num_periods]):
+                slots[day * num_periods + period] = period_str.strip() == "1"
+
+        availability = np.frombuffer(slots, dtype=bool).reshape(num_days, num_periods)
+        if debug:
+            logger.debug(f"Parsed availability: {availability.tolist()}")
         return availability
     except Exception as e:
         logger.error(f"Error parsing availability: {str(e)}")
         # Return a default availability (all False) if parsing fails
-        return [[False for _ in range(num_periods)] for _ in range(num_days)]
+        return np.zeros((num_days, num_periods), dtype=bool)
+
+
+def parse_availability_array(availability: pd.Series, num_days: int = 5, num_periods: int = 8) -> np.ndarray:
+    """
+    Parse a column of availability strings into a boolean array, giving the same result as `parse_availability`.
+
+    Args:
+        availability (pd.Series): Availability strings, one per teacher.
+        num_days (int): Number of days in the schedule.
+        num_periods (int): Number of periods per day.
+
+    Returns:
+        np.ndarray: Boolean array of shape (number of teachers, num_days, num_periods).
+    """
+    array = np.zeros((len(availability), num_days, num_periods), dtype=bool)
+
+    # Rows of exactly num_days days of num_periods "0"/"1" fields, each optionally padded with spaces or tabs, are
+    # decoded from their digits alone; parse_availability (which strips each field) reads them the same way
+    field = r"[ \t]*[01][ \t]*"
+    day = f"{field}(?:,{field}){{{num_periods - 1}}}"
+    well_formed = availability.str.fullmatch(f"{day}(?:;{day}){{{num_days - 1}}}").to_numpy(dtype=bool, na_value=False)
+    digits = "".join(availability[well_formed].str.replace(r"[^01]", "", regex=True))
+    array[well_formed] = (np.frombuffer(digits.encode(), dtype="S1") == b"1").reshape(-1, num_days, num_periods)
+
+    # Any other row (missing, extra or uneven slots) is parsed on its own, so it never affects the other rows
+    for i in np.flatnonzero(~well_formed):
+        array[i] = parse_availability(availability.iloc[i], num_days, num_periods)
+    return array
+
+
+def pack_availability(availability: np.ndarray) -> List[int]:
+    """
+    Pack an array of availabilities into one bitmask per teacher (see `availability_bits`).
+
+    Args:
+        availability (np.ndarray): Boolean array of shape (number of teachers, num_days, num_periods).
+
+    Returns:
+        List[int]: The availability bitmask of each teacher.
+    """
+    if len(availability) == 0:
+        return []  # reshape(0, -1) cannot infer the number of slots
+    # Little-endian bit and byte order puts slot day * num_periods + period at that bit of the int
+    packed = np.packbits(availability.reshape(len(availability), -1), axis=1, bitorder="little")
+    return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+
+def availability_bits(availability: Any, num_days: int = NUM_DAYS, num_periods: int = NUM_PERIODS) -> int:
+    """
+    Pack availability into an int bitmask: bit (day * num_periods + period) is set if the teacher is available.
+
+    Args:
+        availability (Any): Availability string, or a (days, periods) nested list or array of booleans.
+        num_days (int): Number of days in the schedule.
+        num_periods (int): Number of periods per day.
+
+    Returns:
+        int: The availability bitmask.
+    """
+    if isinstance(availability, str):
+        availability = parse_availability(availability, num_days, num_periods)
+    bits = 0
+    for day, day_availability in enumerate(availability[:num_days]):
+        for period, available in enumerate(day_availability[:num_periods]):
+            if available:
+                bits |= 1 << (day * num_periods + period)
+    return bits
 
 
 def validate_data(teachers: List[Dict[str, Any]], classes: List[Dict[str, Any]],
                   rooms: List[Dict[str, Any]], time_slots: List[tuple]) -> None:
     """
-    Validate the loaded data to ensure it meets basic requirements.
+    Validate the loaded data to ensure it meets basic requirements, including that every class's subject has a
+    teacher (only teachers of the subject can teach a class).
 
     Args:
         teachers (List[Dict[str, Any]]): List of teacher dictionaries.
@@ -216,6 +277,17 @@ def validate_data(teachers: List[Dict[str, Any]], classes: List[Dict[str, Any]],
     if not time_slots:
         logger.error("No time slots loaded.")
         raise ValueError("No time slots loaded.")
+    taught = {subject for teacher in teachers for subject in teacher["Subjects"]}
+    untaught = {}
+    for class_ in classes:
+        if class_["Subject"] not in taught:
+            untaught.setdefault(class_["Subject"], []).append(class_["ID"])
+    if untaught:
+        message = "No teacher teaches " + "; ".join(
+            f"{getattr(subject, 'value', subject)} (classes {', '.join(class_ids)})"
+            for subject, class_ids in untaught.items()) + "."
+        logger.error(message)
+        raise ValueError(message)
     logger.debug("Data validation completed successfully")
 
 
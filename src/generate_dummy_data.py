@@ -6,9 +6,13 @@ A script to generate dummy data for school scheduling.
 
 from enum import Enum
 import random
-import csv
 from typing import List, Dict, Tuple
-import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import pack_availability
 
 
 class Subject(Enum):
@@ -31,6 +35,13 @@ class RoomType(Enum):
     GYM = "Gym"
 
 
+# Enum members, and their string values, listed once rather than on every generator call
+_SUBJECTS = list(Subject)
+_ROOM_TYPES = list(RoomType)
+_SUBJECT_VALUES = {subject: subject.value for subject in Subject}
+_ROOM_TYPE_VALUES = {room_type: room_type.value for room_type in RoomType}
+
+
 # Dataset size configuration
 SMALL_DATASET = {
     "teachers": 10,
@@ -54,57 +65,81 @@ def get_dataset_size():
 
 def generate_teachers(num_teachers: int) -> List[Dict]:
     """Generate a list of teacher dictionaries."""
-    teachers = []
-    for i in range(num_teachers):
-        availability = []
-        for _ in range(5):  # 5 days
-            day_availability = []
-            available_hours = random.randint(3, 5)
-            for _ in range(8):  # 8 periods
-                if available_hours > 0 and random.random() > 0.3:
-                    day_availability.append('1')
-                    available_hours -= 1
-                else:
-                    day_availability.append('0')
-            availability.append(','.join(day_availability))
-
-        teacher = {
+    if num_teachers == 0:
+        return []  # The reshapes below cannot infer a dimension from an empty array
+    # Seeded from `random`, so random.seed() still makes the generated data reproducible
+    rng = np.random.default_rng(random.getrandbits(64))
+
+    # Each day (5 days, 8 periods), a teacher is available in the first 3-5 periods that pass a 70% draw
+    available_hours = rng.integers(3, 6, size=(num_teachers, 5, 1))
+    passes = rng.random((num_teachers, 5, 8)) > 0.3
+    available = passes & (np.cumsum(passes, axis=2) <= available_hours)
+
+    # Write each day as "1,0,...,1;" and each teacher's week as one 80-byte string (dropping the final ';')
+    chars = np.full((num_teachers, 5, 16), b',', dtype='S1')
+    chars[:, :, 0::2] = np.where(available, b'1', b'0')
+    chars[:, :, -1] = b';'
+    availability = [week[:-1].decode() for week in chars.reshape(num_teachers, -1).view('S80').ravel()]
+    # Also pack the mask into each teacher's bitmask, so in-memory data does not need its strings parsing again
+    avail_bits = pack_availability(available)
+
+    # 1-3 distinct subjects per teacher: the first columns of a random permutation of the subjects
+    num_subjects = rng.integers(1, 4, size=num_teachers)
+    subject_order = rng.random((num_teachers, len(_SUBJECTS))).argsort(axis=1)
+    subjects = [[_SUBJECTS[j] for j in subject_order[i, :num_subjects[i]]] for i in range(num_teachers)]
+    # Classes can be of any subject, so give each subject nobody drew to a teacher with the fewest subjects
+    taught = {subject for teacher_subjects in subjects for subject in teacher_subjects}
+    for subject in _SUBJECTS:
+        if subject not in taught:
+            # Ties go to a random one of those teachers
+            subjects[min(rng.permutation(num_teachers), key=lambda i: len(subjects[i]))].append(subject)
+    full_time = rng.random(num_teachers) < 0.5
+
+    return [
+        {
             "ID": f"T{i + 1:03d}",
             "Name": f"Teacher {i + 1}",
-            "Subjects": random.sample(list(Subject), random.randint(1, 3)),
-            "FullTime": random.choice([True, False]),
-            "Availability": ';'.join(availability)
+            "Subjects": subjects[i],
+            "FullTime": bool(full_time[i]),
+            "Availability": availability[i],
+            "AvailBits": avail_bits[i]
         }
-        teachers.append(teacher)
-    return teachers
+        for i in range(num_teachers)
+    ]
 
 
 def generate_classes(num_classes: int) -> List[Dict]:
     """Generate a list of class dictionaries."""
-    classes = []
-    for i in range(num_classes):
-        class_ = {
+    rng = np.random.default_rng(random.getrandbits(64))
+    subject_idx = rng.integers(0, len(_SUBJECTS), size=num_classes)
+    grade_levels = rng.integers(7, 13, size=num_classes).tolist()
+    num_students = rng.integers(20, 36, size=num_classes).tolist()
+    periods_per_week = rng.integers(3, 6, size=num_classes).tolist()
+    return [
+        {
             "ID": f"C{i+1:03d}",
-            "Subject": random.choice(list(Subject)),
-            "GradeLevel": random.randint(7, 12),
-            "NumStudents": random.randint(20, 35),
-            "PeriodsPerWeek": random.randint(3, 5)
+            "Subject": _SUBJECTS[subject_idx[i]],
+            "GradeLevel": grade_levels[i],
+            "NumStudents": num_students[i],
+            "PeriodsPerWeek": periods_per_week[i]
         }
-        classes.append(class_)
-    return classes
+        for i in range(num_classes)
+    ]
 
 
 def generate_rooms(num_rooms: int) -> List[Dict]:
     """Generate a list of room dictionaries."""
-    rooms = []
-    for i in range(num_rooms):
-        room = {
+    rng = np.random.default_rng(random.getrandbits(64))
+    capacities = rng.integers(20, 41, size=num_rooms).tolist()
+    type_idx = rng.integers(0, len(_ROOM_TYPES), size=num_rooms)
+    return [
+        {
             "ID": f"R{i+1:03d}",
-            "Capacity": random.randint(20, 40),
-            "Type": random.choice(list(RoomType))
+            "Capacity": capacities[i],
+            "Type": _ROOM_TYPES[type_idx[i]]
         }
-        rooms.append(room)
-    return rooms
+        for i in range(num_rooms)
+    ]
 
 
 def generate_time_slots() -> List[Tuple[int, int]]:
@@ -112,22 +147,14 @@ def generate_time_slots() -> List[Tuple[int, int]]:
     return [(day, period) for day in range(5) for period in range(8)]
 
 
-def save_to_csv(data: List[Dict], filename: str):
-    """Save a list of dictionaries to a CSV file in the data folder."""
-    if not data:
+def save_to_csv(data: pd.DataFrame, filepath: Path):
+    """Save a DataFrame to a CSV file, in a directory that already exists."""
+    if data.empty:
         return
 
-    keys = data[0].keys()
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(os.path.dirname(current_dir), 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    filepath = os.path.join(data_dir, filename)
-
+    filename = filepath.name
     try:
-        with open(filepath, 'w', newline='') as output_file:
-            dict_writer = csv.DictWriter(output_file, keys)
-            dict_writer.writeheader()
-            dict_writer.writerows(data)
+        data.to_csv(filepath, index=False)
         print(f"Successfully saved {filename} to {filepath}")
     except PermissionError:
         print(f"Permission denied: Unable to write to {filepath}")
@@ -144,18 +171,16 @@ def main():
     rooms = generate_rooms(dataset_size["rooms"])
     time_slots = generate_time_slots()
 
+    data_dir = Path(__file__).resolve().parent.parent / 'data'
+    data_dir.mkdir(exist_ok=True)
+
     # Convert Enum values to strings before saving
-    for teacher in teachers:
-        teacher['Subjects'] = [subject.value for subject in teacher['Subjects']]
-    for class_ in classes:
-        class_['Subject'] = class_['Subject'].value
-    for room in rooms:
-        room['Type'] = room['Type'].value
-
-    save_to_csv(teachers, 'teachers.csv')
-    save_to_csv(classes, 'classes.csv')
-    save_to_csv(rooms, 'rooms.csv')
-    save_to_csv([{"Day": day, "Period": period} for day, period in time_slots], 'time_slots.csv')
+    save_to_csv(pd.DataFrame(teachers).drop(columns="AvailBits").assign(
+        Subjects=lambda df: df['Subjects'].map(lambda subjects: ','.join(_SUBJECT_VALUES[s] for s in subjects))),
+        data_dir / 'teachers.csv')
+    save_to_csv(pd.DataFrame(classes).assign(Subject=lambda df: df['Subject'].map(_SUBJECT_VALUES)), data_dir / 'classes.csv')
+    save_to_csv(pd.DataFrame(rooms).assign(Type=lambda df: df['Type'].map(_ROOM_TYPE_VALUES)), data_dir / 'rooms.csv')
+    save_to_csv(pd.DataFrame(time_slots, columns=["Day", "Period"]), data_dir / 'time_slots.csv')
 
     print(f"Dummy data generated and saved to CSV files in the 'data' folder.")
     print(f"Dataset size: {'Small' if USE_SMALL_DATASET else 'Full'}")
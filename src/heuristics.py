@@ -0,0 +1,112 @@
+"""
+`heuristics.py`:
+
+This module contains a greedy heuristic for the school scheduling problem, used to give the solver a starting
+point (a solution hint) when there is no previous solution to warm-start from, and the assignment of rooms to a
+solved schedule.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple, Iterable, Set, Optional
+
+
+def _free_rooms(rooms: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+    """(capacity, room ID) pairs for all the rooms, smallest first."""
+    return sorted((r["Capacity"], r["ID"]) for r in rooms)
+
+
+def _take_room(free_rooms: List[Tuple[int, str]], size: int) -> Optional[str]:
+    """
+    Remove the smallest of the free rooms that holds `size` students, returning its ID (or None if none does).
+
+    Args:
+        free_rooms: (capacity, room ID) pairs, smallest first, as from `_free_rooms`
+        size: Number of students in the class
+    """
+    i = bisect_left(free_rooms, (size,))
+    if i == len(free_rooms):
+        return None
+    return free_rooms.pop(i)[1]
+
+
+def greedy_assignments(
+    candidates: Iterable[Tuple[str, str, Tuple[int, int]]],
+    classes: List[Dict[str, Any]],
+    rooms: List[Dict[str, Any]]
+) -> Set[Tuple[str, str, Tuple[int, int]]]:
+    """
+    Greedily pick assignments, largest classes first, into the earliest free time slots.
+
+    Each class takes the first candidates whose teacher and time slot are still free and that leave a room big
+    enough for it, until it has its required periods per week. Filling the earliest slots first keeps each
+    teacher's periods bunched together. The result respects all hard constraints but may leave classes short of
+    periods.
+
+    Args:
+        candidates: Feasible (teacher ID, class ID, time slot) assignments, i.e. the decision variable keys
+        classes: List of class dictionaries
+        rooms: List of room dictionaries
+
+    Returns:
+        Set of chosen (teacher ID, class ID, time slot) assignments
+    """
+    class_candidates = defaultdict(list)
+    for key in candidates:
+        class_candidates[key[1]].append(key)
+
+    chosen = set()
+    busy = set()  # ("teacher" | "class", ID, time slot) triples already taken
+    free_rooms = {}  # Time slot -> rooms not yet taken in it
+    for c in sorted(classes, key=lambda c: c["NumStudents"], reverse=True):
+        periods = 0
+        for t, c_id, ts in sorted(class_candidates[c["ID"]], key=lambda key: key[2]):
+            if periods == c["PeriodsPerWeek"]:
+                break
+            slots = (("teacher", t, ts), ("class", c_id, ts))
+            if any(slot in busy for slot in slots):
+                continue
+            if ts not in free_rooms:
+                free_rooms[ts] = _free_rooms(rooms)
+            # Larger classes are placed first, so taking the smallest room that fits never crowds out a later class
+            if _take_room(free_rooms[ts], c["NumStudents"]) is None:
+                continue
+            busy.update(slots)
+            chosen.add((t, c_id, ts))
+            periods += 1
+    return chosen
+
+
+def assign_rooms(
+    assignments: Iterable[Tuple[str, str, Tuple[int, int]]],
+    classes: List[Dict[str, Any]],
+    rooms: List[Dict[str, Any]]
+) -> Dict[Tuple[str, str, Tuple[int, int]], str]:
+    """
+    Give each assignment of a solved schedule a room.
+
+    In each time slot the biggest classes go first, each into the smallest free room that fits. This succeeds
+    for any schedule that satisfies `constraints.rooms_per_period`.
+
+    Args:
+        assignments: (teacher ID, class ID, time slot) assignments that are made
+        classes: List of class dictionaries
+        rooms: List of room dictionaries
+
+    Returns:
+        Room ID for each assignment
+    """
+    size = {c["ID"]: c["NumStudents"] for c in classes}
+    by_time_slot = defaultdict(list)
+    for key in assignments:
+        by_time_slot[key[2]].append(key)
+
+    room_of = {}
+    for ts, keys in by_time_slot.items():
+        free_rooms = _free_rooms(rooms)
+        for key in sorted(keys, key=lambda key: size[key[1]], reverse=True):
+            room_id = _take_room(free_rooms, size[key[1]])
+            if room_id is None:
+                raise ValueError(f"No free room fits class {key[1]} in time slot {ts}")
+            room_of[key] = room_id
+    return room_of
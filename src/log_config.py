@@ -6,11 +6,10 @@ This module contains the configuration for logging in the school scheduling syst
 
 
 import logging
+import os
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Set up logging. The level defaults to WARNING (debug logging in the model-building loops is expensive);
+# set e.g. BRICKS_LOG=INFO or BRICKS_LOG=DEBUG for more detail.
+LOG_LEVEL = getattr(logging, os.getenv("BRICKS_LOG", "WARNING").upper(), logging.WARNING)
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
-
-# Ensure logs from other modules are captured
-logging.getLogger("scheduler").setLevel(logging.INFO)
-logging.getLogger("objectives").setLevel(logging.INFO)
@@ -8,75 +8,65 @@ The two main objectives are:
 2. Optimize distribution of classes.
 """
 
-import sys
-import os
-
-# Ensure the 'src' directory is added to the system path
-sys.path.append(os.path.abspath(os.path.dirname(__file__)))
-
+import logging
 import traceback
-from ortools.linear_solver import pywraplp
-from typing import Dict, List, Any, Tuple
+from ortools.sat.python import cp_model
+from typing import Dict, List, Any
 
-from log_config import logger
-from utils import log_memory_usage
+from .constraints import VariableIndex
+from .data_loader import NUM_DAYS, NUM_PERIODS
+from .log_config import logger
+from .utils import log_memory_usage
 
 def minimize_teacher_gaps(
-        x: Dict[Tuple[str, str, str, Tuple[int, int]], pywraplp.Variable],
-        teachers: List[Dict[str, Any]],
-        classes: List[Dict[str, Any]],
-        rooms: List[Dict[str, Any]],
-        time_slots: List[Tuple[int, int]]
-) -> pywraplp.Variable:
+        model: cp_model.CpModel,
+        index: VariableIndex,
+        teachers: List[Dict[str, Any]]
+) -> cp_model.LinearExpr:
     """
     Implement objective: minimize gaps in teachers' schedules.
+
+    A teacher's teaching in a period is the sum of their variables for that time slot, taken from the variable
+    index shared with the constraints. A gap is an empty period with teaching either side of it.
+
+    Each gap variable is only bounded from below, which is enough as long as the objective is minimized with a
+    non-negative weight: the solver pushes it down to 1 exactly when there is a gap.
     """
     logger.info("Starting minimize_teacher_gaps calculation")
     log_memory_usage()
-    solver = pywraplp.Solver.CreateSolver('SCIP')
+    debug = logger.isEnabledFor(logging.DEBUG)
 
-    try:
-        logger.debug("Creating total_gaps variable")
-        total_gaps = solver.IntVar(0, solver.infinity(), 'total_gaps')
+    days = range(NUM_DAYS)
+    day_slots = [[(d, p) for p in range(NUM_PERIODS)] for d in days]  # Time slot keys, built once for all teachers
+    middle_periods = range(1, NUM_PERIODS - 1)  # Periods that have a period either side of them
 
+    try:
         gap_vars = []
         logger.info(f"Processing {len(teachers)} teachers")
+        memory_sample_every = max(1, len(teachers) // 10)  # Read memory usage about ten times, not per teacher
         for i, t in enumerate(teachers):
-            logger.debug(f"Processing teacher {i + 1}/{len(teachers)}: {t['ID']}")
-            for d in range(5):  # Assuming 5 days in a week
-                logger.debug(f"Processing day {d + 1} for teacher {t['ID']}")
-                teaching_periods = []
-                for p in range(8):  # Assuming 8 periods per day
-                    dummy_var = solver.IntVar(0, 0, f'dummy_{t["ID"]}_{d}_{p}')
-                    period_sum = solver.Sum([
-                        x.get((t['ID'], c['ID'], r['ID'], (d, p)), dummy_var)
-                        for c in classes
-                        for r in rooms
-                    ])
-                    teaching_periods.append(period_sum)
-
-                for p in range(1, 7):
-                    # gap is a binary variable
-                    gap = solver.IntVar(0, 1, f'gap_{t["ID"]}_{d}_{p}')
-
-                    # Necessary condition: gap can only exist if periods either side are occupied
-                    solver.Add(gap >= teaching_periods[p - 1] + teaching_periods[p + 1] - 1)
-
-                    # Necessary condition: gap can only exist if the current period is empty
-                    solver.Add(gap <= 1 - teaching_periods[p])
-
-                    # Necessary condition: gap can only exist if the periods either side are occupied
-                    solver.Add(gap <= teaching_periods[p - 1])
-                    solver.Add(gap <= teaching_periods[p + 1])
-
+            t_id = t['ID']
+            if debug:
+                logger.debug("Processing teacher %d/%d: %s", i + 1, len(teachers), t_id)
+                if i % memory_sample_every == 0:
+                    log_memory_usage()
+            for d in days:
+                # Each period's variable list goes straight to LinearExpr.Sum; periods without variables are None
+                period_vars = [index.by_teacher_ts.get((t_id, ts)) for ts in day_slots[d]]
+                teaching_periods = [cp_model.LinearExpr.Sum(variables) if variables else 0 for variables in period_vars]
+
+                for p in middle_periods:
+                    if not period_vars[p - 1] or not period_vars[p + 1]:
+                        continue  # The teacher cannot teach on both sides, so there can be no gap here
+
+                    # gap is a binary variable, forced to 1 if the periods either side are occupied and this one is not
+                    gap = model.NewBoolVar(f'gap_{t_id}_{d}_{p}' if debug else '')
+                    model.Add(gap >= teaching_periods[p - 1] + teaching_periods[p + 1] - teaching_periods[p] - 1)
                     gap_vars.append(gap)
 
-            log_memory_usage()
-
-        logger.debug("Adding total_gaps constraint")
-        solver.Add(total_gaps == solver.Sum(gap_vars))
+        total_gaps = cp_model.LinearExpr.Sum(gap_vars)
 
-        logger.info("Finished minimize_teacher_gaps calculation")
+        logger.info(f"Finished minimize_teacher_gaps calculation: {len(gap_vars)} gap variables")
         log_memory_usage()
         return total_gaps
     except Exception as e:
@@ -85,19 +75,39 @@ def minimize_teacher_gaps(
         raise
 
 
+def build_objective_terms(
+        model: cp_model.CpModel,
+        index: VariableIndex,
+        teachers: List[Dict[str, Any]]
+) -> Dict[str, cp_model.LinearExpr]:
+    """
+    Build the unweighted objective components, keyed by their weight name.
+
+    The components only depend on the model, not on the weights, so they can be built once and re-weighted
+    with `weighted_objective` for each solve.
+    """
+    logger.info("Building objective terms")
+    return {"gaps": minimize_teacher_gaps(model, index, teachers)}
+
+
+def weighted_objective(terms: Dict[str, cp_model.LinearExpr], weights: Dict[str, float]) -> cp_model.LinearExpr:
+    """
+    Combine objective components into a single expression. Components without a weight get a weight of 1.
+    """
+    return sum(weights.get(name, 1.0) * term for name, term in terms.items())
+
+
 def combined_objective(
-        x: Dict[Tuple[str, str, str, Tuple[int, int]], pywraplp.Variable],
+        model: cp_model.CpModel,
+        index: VariableIndex,
         teachers: List[Dict[str, Any]],
-        classes: List[Dict[str, Any]],
-        rooms: List[Dict[str, Any]],
-        time_slots: List[Tuple[int, int]],
         weights: Dict[str, float]
-) -> pywraplp.Variable:
+) -> cp_model.LinearExpr:
     """
-    Use only the minimize_teacher_gaps objective.
+    Combine the objective components (currently only minimize_teacher_gaps) using the given weights.
     """
     logger.info("Starting combined_objective calculation")
-    return minimize_teacher_gaps(x, teachers, classes, rooms, time_slots)
+    return weighted_objective(build_objective_terms(model, index, teachers), weights)
 
 
 # def optimize_class_distribution(
@@ -6,10 +6,35 @@ This module contains the Data Input page for the school scheduling system.
 
 import streamlit as st
 import pandas as pd
+from io import BytesIO
+from typing import Dict, Any
 from src.scheduler import Scheduler
+from src.data_loader import load_all_data
 from src import utils
 from src.generate_dummy_data import generate_teachers, generate_classes, generate_rooms, generate_time_slots, Subject
 
+@st.cache_data(show_spinner=False)
+def load_uploaded_data(teachers_bytes: bytes, classes_bytes: bytes, rooms_bytes: bytes,
+                       time_slots_bytes: bytes) -> Dict[str, Any]:
+    """Parse the uploaded CSV files. Cached on the file contents, so reruns skip the parsing."""
+    return load_all_data(BytesIO(teachers_bytes), BytesIO(classes_bytes), BytesIO(rooms_bytes),
+                         BytesIO(time_slots_bytes))
+
+
+@st.cache_resource(show_spinner="Building the scheduling model...")
+def build_scheduler(data: Dict[str, Any]) -> Scheduler:
+    """
+    Create a Scheduler and build its model (variables and constraints).
+
+    Cached as a resource because the solver model cannot be pickled; reruns with the same data reuse the
+    built model, so only the objective and solve step are repeated. The cached Scheduler is shared by every
+    browser session that loads the same data, so solves must hold its `lock` (see `solve.solve_schedule`).
+    """
+    scheduler = Scheduler(data)
+    scheduler.build_model()
+    return scheduler
+
+
 def show():
     st.title("Data Input")
 
@@ -37,16 +62,11 @@ def show_upload_data():
     if all([teachers_file, classes_file, rooms_file, time_slots_file]):
         st.success("All files uploaded successfully!")
 
-        data_files = {
-            "teachers_file": teachers_file,
-            "classes_file": classes_file,
-            "rooms_file": rooms_file,
-            "time_slots_file": time_slots_file
-        }
-
         if st.button("Initialize Scheduler"):
             try:
-                scheduler = Scheduler(data_files)
+                data = load_uploaded_data(teachers_file.getvalue(), classes_file.getvalue(),
+                                          rooms_file.getvalue(), time_slots_file.getvalue())
+                scheduler = build_scheduler(data)
                 st.session_state.scheduler = scheduler
                 st.session_state.scheduler_initialized = True
                 # st.rerun()
@@ -103,7 +123,7 @@ def show_generate_data():
 
         if st.button("Initialize Scheduler with Generated Data"):
             try:
-                scheduler = Scheduler(st.session_state.generated_data)
+                scheduler = build_scheduler(st.session_state.generated_data)
                 st.session_state.scheduler = scheduler
                 st.session_state.scheduler_initialized = True
                 # st.rerun()
@@ -9,6 +9,27 @@ import pandas as pd
 from src import utils
 
 
+@st.cache_data(show_spinner=False)
+def schedule_dataframe(schedule) -> pd.DataFrame:
+    """
+    The schedule as one table (see `utils.schedule_to_dataframe`), cached so reruns skip the rebuild.
+
+    The columns are Arrow-backed, so st.dataframe can send them to the browser without converting them.
+    """
+    return utils.schedule_to_dataframe(schedule)
+
+
+@st.cache_data(show_spinner=False)
+def schedule_analytics(schedule, _scheduler, scheduler_id) -> utils.ScheduleAnalytics:
+    """
+    Compute all the schedule analyses, cached so reruns (e.g. switching tabs) skip them.
+
+    The scheduler is not hashed (hence the leading underscore); `scheduler_id` identifies its data instead.
+    """
+    data = _scheduler.data
+    return utils.compute_all_analytics(schedule, data["teachers"], data["classes"], data["rooms"], data["time_slots"])
+
+
 def show():
     st.title("Results")
 
@@ -23,58 +44,61 @@ def show():
 
     # Display schedule
     st.header("Generated Schedule")
-    for day, classes in schedule.items():
-        with st.expander(f"Day {day + 1}"):
-            df = pd.DataFrame(classes)
-            st.dataframe(df)
+    schedule_df = schedule_dataframe(schedule)
+    days = [day + 1 for day in schedule]
+    all_tab, *day_tabs = st.tabs(["All days"] + [f"Day {day}" for day in days])
+    with all_tab:
+        st.dataframe(schedule_df, use_container_width=True, hide_index=True)
+    for day_tab, day in zip(day_tabs, days):
+        with day_tab:
+            # Slices of the shared table; no per-day DataFrame construction or styling
+            st.dataframe(schedule_df[schedule_df["Day"] == day].drop(columns="Day"), use_container_width=True,
+                         hide_index=True)
 
     # Visualizations
     st.header("Schedule Analysis")
 
-    col1, col2 = st.columns(2)
-
-    with col1:
-        # Teacher Workload
-        st.subheader("Teacher Workload")
-        teacher_workload = utils.calculate_teacher_workload(schedule)
-        st.bar_chart(teacher_workload)
-
-        # Class Distribution
-        st.subheader("Class Distribution")
-        class_distribution = utils.analyze_class_distribution(schedule, scheduler.data["teachers"])
-        st.bar_chart(pd.DataFrame(class_distribution).T)
-
-        # Room Utilization
-        st.subheader("Room Utilization")
-        room_utilization = utils.calculate_room_utilization(schedule, scheduler.data["rooms"], scheduler.data["time_slots"])
-        st.bar_chart(room_utilization)
-
-    with col2:
-        # Teacher Utilization
-        try:
-            teacher_utilization = utils.calculate_teacher_utilization(schedule, scheduler.data["teachers"],
-                                                                      scheduler.data["time_slots"])
-            st.subheader("Teacher Utilization")
-            st.bar_chart(teacher_utilization)
-        except Exception as e:
-            st.error(f"Error calculating teacher utilization: {str(e)}")
-            st.text("Teacher data format:")
-            st.write(scheduler.data["teachers"][0])  # Display the first teacher's data for debugging
-
-        # Teacher Gaps
-        st.subheader("Teacher Gaps")
-        teacher_gaps = utils.analyze_gaps(schedule, scheduler.data["teachers"])
-        st.bar_chart(teacher_gaps)
-
-        # Subject Balance
-        st.subheader("Subject Balance")
-        subject_balance = utils.analyze_subject_balance(schedule, scheduler.data["classes"])
-        st.bar_chart(subject_balance)
+    try:
+        analytics = schedule_analytics(schedule, scheduler, id(scheduler))
+    except Exception as e:
+        st.error(f"Error analysing the schedule: {str(e)}")
+        st.text("Teacher data format:")
+        st.write(scheduler.data["teachers"][0])  # Display the first teacher's data for debugging
+        analytics = None
+
+    if analytics is not None:
+        teachers_tab, rooms_tab, subjects_tab = st.tabs(["Teachers", "Rooms", "Subjects"])
+
+        with teachers_tab:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("Teacher Workload")
+                st.bar_chart(analytics.teacher_workload)
+
+                st.subheader("Class Distribution")
+                st.bar_chart(pd.DataFrame(analytics.class_distribution).T)
+
+            with col2:
+                st.subheader("Teacher Utilization")
+                st.bar_chart(analytics.teacher_utilization)
+
+                st.subheader("Teacher Gaps")
+                st.bar_chart(analytics.teacher_gaps)
+
+        with rooms_tab:
+            st.subheader("Room Utilization")
+            st.bar_chart(analytics.room_utilization)
+
+        with subjects_tab:
+            st.subheader("Subject Balance")
+            st.bar_chart(analytics.subject_balance)
 
     # Statistics
     st.header("Schedule Statistics")
-    stats = utils.calculate_schedule_statistics(schedule)
-    st.dataframe(pd.DataFrame([stats]))
+    stats = analytics.statistics if analytics is not None else utils.calculate_schedule_statistics(schedule)
+    # One row per statistic, as strings: the per-day/teacher/room breakdowns are dicts, which Arrow cannot convert
+    st.dataframe(pd.DataFrame({"Statistic": list(stats), "Value": [str(value) for value in stats.values()]}),
+                 hide_index=True)
 
     # Export option
     if st.button("Export Schedule to CSV"):
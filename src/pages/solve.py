@@ -5,27 +5,56 @@ This module contains the Solve page for the school scheduling system.
 """
 
 import streamlit as st
+import os
 import time
-import threading
 import traceback
+from ortools.sat.python import cp_model
 from src.scheduler_utils import run_scheduler
-from src.utils import log_memory_usage
+from src.utils import sample_memory_usage
 
 
-class TimeoutException(Exception):
-    pass
+SOLVER_TIMEOUT = 300  # seconds
 
-def run_with_timeout(func, args, timeout):
-    result = [None]
-    def worker():
-        result[0] = func(*args)
 
-    thread = threading.Thread(target=worker)
-    thread.start()
-    thread.join(timeout)
-    if thread.is_alive():
-        raise TimeoutException("Solver timed out")
-    return result[0]
+class _UncachedSchedule(Exception):
+    """Carries a schedule out of `_solve_optimal_schedule` without Streamlit caching it."""
+
+    def __init__(self, schedule):
+        super().__init__("Schedule is not proven optimal")
+        self.schedule = schedule
+
+
+@st.cache_data(show_spinner=False)
+def _solve_optimal_schedule(_scheduler, scheduler_id, weights, num_workers, solver_params, portfolio):
+    """
+    Run the scheduler, caching the schedule only if it is proven optimal.
+
+    A failed solve (None) or a schedule that is merely feasible (e.g. after a timeout) is raised as an
+    `_UncachedSchedule` instead, since st.cache_data does not cache a call that raises: solving again then
+    retries, warm-started from the previous solution, rather than returning the stale result. Portfolio
+    results are never cached, as the winning configuration's status is not reported back.
+    """
+    schedule = run_scheduler(_scheduler, dict(weights), timeout=SOLVER_TIMEOUT, num_workers=num_workers,
+                             solver_params=dict(solver_params), portfolio=portfolio)
+    if schedule is None or portfolio or _scheduler.status != cp_model.OPTIMAL:
+        raise _UncachedSchedule(schedule)
+    return schedule
+
+
+def solve_schedule(scheduler, scheduler_id, weights, num_workers, solver_params, portfolio):
+    """
+    Run the scheduler, so that generating again with unchanged inputs is instant once an optimal schedule is found.
+
+    The scheduler itself is not hashed; `scheduler_id` identifies it instead. The settings are passed as sorted
+    item tuples so they hash the same regardless of dict order. The scheduler is shared by every session that
+    loads the same data (see `data_input.build_scheduler`), so its lock serialises their solves.
+    """
+    with scheduler.lock:
+        try:
+            return _solve_optimal_schedule(scheduler, scheduler_id, weights, num_workers, solver_params, portfolio)
+        except _UncachedSchedule as result:
+            return result.schedule
+
 
 def show():
     st.title("Solve")
@@ -34,26 +63,54 @@ def show():
         st.warning("Please initialize the scheduler in the Data Input page first.")
         return
 
+    solve_section(st.session_state.scheduler)
+
+
+@st.fragment
+def solve_section(scheduler):
+    """
+    Solver settings and the "Generate Schedule" button.
+
+    Runs as a fragment, so changing a setting only reruns this section rather than the whole app.
+    """
     st.header("Solver Settings")
     with st.expander("Objective Weights", expanded=False):
         weights = {
             "gaps": st.slider("Weight for minimizing gaps", 0.0, 1.0, 1.0),
         }
+    max_workers = os.cpu_count() or 1
+    num_workers = st.slider("Number of solver workers", 1, max(max_workers, 2), max_workers)
+
+    with st.expander("Advanced Solver Settings", expanded=False):
+        linearization_level = st.selectbox(
+            "Linearization level", [0, 1, 2], index=0,
+            help="How much of the model CP-SAT linearizes into its LP relaxation. 0 is usually fastest for "
+                 "small, loosely-constrained instances; 2 gives stronger bounds on hard ones.")
+        presolve = st.checkbox("Presolve", value=True,
+                               help="Simplify the model before solving. Usually faster; disable for small "
+                                    "instances where presolve costs more than it saves.")
+        gap_limit = st.number_input("Relative optimality gap", 0.0, 1.0, 0.0, format="%.4f",
+                                    help="Stop once the solution is provably within this fraction of optimal.")
+        portfolio = st.checkbox("Portfolio mode", value=False,
+                                help="Race several solver configurations in parallel and keep the first "
+                                     "schedule found. Ignores the settings above.")
+    solver_params = {
+        "linearization_level": linearization_level,
+        "cp_model_presolve": presolve,
+        "relative_gap_limit": gap_limit,
+    }
 
     if st.button("Generate Schedule"):
         with st.spinner("Generating schedule..."):
             try:
                 start_time = time.time()
-                log_memory_usage()
 
-                try:
-                    schedule = run_with_timeout(run_scheduler, (st.session_state.scheduler, weights, 300), 300)
-                except TimeoutException:
-                    st.error("The solver timed out. Try simplifying the problem or increasing the timeout.")
-                    return
+                # The solver enforces the time limit itself, so it can run on the session thread
+                with sample_memory_usage():
+                    schedule = solve_schedule(scheduler, id(scheduler), tuple(sorted(weights.items())),
+                                              num_workers, tuple(sorted(solver_params.items())), portfolio)
 
                 end_time = time.time()
-                log_memory_usage()
 
                 if schedule is not None:
                     st.success(f"Schedule generated successfully in {end_time - start_time:.2f} seconds!")
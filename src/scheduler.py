@@ -2,29 +2,26 @@
 `scheduler.py`:
 
 This module contains the main Scheduler class and related functions for solving
-the school scheduling problem using OR-Tools.
+the school scheduling problem using the OR-Tools CP-SAT solver.
 """
 import sys
 import os
-
-# Ensure the 'src' directory is added to the system path
-sys.path.append(os.path.abspath(os.path.dirname(__file__)))
-
 import logging
+import threading
 import traceback
-from ortools.linear_solver import pywraplp
-from typing import Dict, List, Any, Tuple
-import data_loader
-import constraints
-from log_config import logger
-import objectives
-import time
-
-from utils import log_memory_usage
+from ortools.sat.python import cp_model
+from typing import Dict, List, Any, Optional, Tuple
+from . import data_loader
+from . import constraints
+from .log_config import logger
+from . import objectives
+from . import heuristics
+from collections import defaultdict
+
+from .utils import log_phase
 #
 # logger = logging.getLogger(__name__)
 
-
 class Scheduler:
     def __init__(self, data_input: Dict[str, Any]):
         """
@@ -34,10 +31,24 @@ class Scheduler:
             data_input (Dict[str, Any]): Dictionary containing either file paths or in-memory data for each data type
         """
         logger.info("Initializing Scheduler")
-        self.solver = pywraplp.Solver.CreateSolver("CBC")
+        self.model = cp_model.CpModel()
+        self.solver = cp_model.CpSolver()
+        # Tuned defaults: no LP relaxation and core-based optimisation of the objective solved the sample datasets
+        # fastest; solve() can override them via solver_params
+        self.solver.parameters.linearization_level = 0
+        self.solver.parameters.optimize_with_core = True
         self.data = self._load_data(data_input)
-        self.x: Dict[Tuple[str, str, str, Tuple[int, int]], pywraplp.Variable] = {}  # Decision variables
+        self._teacher_by_id = {t["ID"]: t for t in self.data["teachers"]}
+        self._class_by_id = {c["ID"]: c for c in self.data["classes"]}
+        self.x: Dict[Tuple[str, str, Tuple[int, int]], cp_model.IntVar] = {}  # Decision variables
+        self.var_index: Optional[constraints.VariableIndex] = None  # Decision variables grouped by constraint axis
         self.solution = None
+        self.status: Optional[int] = None  # CP-SAT status of the last solve, e.g. cp_model.OPTIMAL
+        self.model_built = False
+        self.objective_terms: Optional[Dict[str, Any]] = None  # Unweighted objective components
+        # The model, solver and solution are mutated by each solve; hold this lock around set_objective/solve/
+        # get_schedule when one Scheduler is shared between threads (e.g. Streamlit sessions)
+        self.lock = threading.Lock()
         logger.info("Scheduler initialized")
 
     def _load_data(self, data_input: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
@@ -54,20 +65,65 @@ class Scheduler:
             # If all values are file paths, use load_all_data
             return data_loader.load_all_data(**data_input)
         else:
-            # If in-memory data, assume it's already in the correct format
-            return data_input
+            # If in-memory data, assume it's already in the correct format, apart from the availability bitmask
+            data_loader.validate_data(data_input["teachers"], data_input["classes"], data_input["rooms"],
+                                      data_input["time_slots"])
+            teachers = [
+                teacher if "AvailBits" in teacher
+                else {**teacher, "AvailBits": data_loader.availability_bits(teacher["Availability"])}
+                for teacher in data_input["teachers"]
+            ]
+            return {**data_input, "teachers": teachers}
+
+    @staticmethod
+    def _is_available(teacher: Dict[str, Any], time_slot: Tuple[int, int]) -> bool:
+        """
+        Check whether a teacher is available in a time slot. Slots outside the availability data are treated
+        as available.
+        """
+        day, period = time_slot
+        if day >= data_loader.NUM_DAYS or period >= data_loader.NUM_PERIODS:
+            logger.warning(f"Availability data missing for teacher {teacher['ID']} at time slot {time_slot}")
+            return True
+        return bool((teacher["AvailBits"] >> (day * data_loader.NUM_PERIODS + period)) & 1)
 
     def create_variables(self):
         """
         Create decision variables for the scheduling problem.
+
+        Variables are only created for teachers who teach the class's subject, and in time slots in which the
+        teacher is available, so neither needs a separate constraint: a missing variable is an assignment that
+        cannot be made. Rooms are not a dimension of the variables; they are assigned after solving (see
+        `constraints.rooms_per_period`).
         """
         logger.info("Creating decision variables")
+        available_slots = {
+            teacher["ID"]: [ts for ts in self.data["time_slots"] if self._is_available(teacher, ts)]
+            for teacher in self.data["teachers"]
+        }
+        subject_teachers = defaultdict(list)
         for teacher in self.data["teachers"]:
-            for class_ in self.data["classes"]:
-                for room in self.data["rooms"]:
-                    for time_slot in self.data["time_slots"]:
-                        self.x[teacher["ID"], class_["ID"], room["ID"], time_slot] = \
-                            self.solver.IntVar(0, 1, f'{teacher["ID"]}_{class_["ID"]}_{room["ID"]}_{time_slot}')
+            for subject in teacher["Subjects"]:
+                subject_teachers[subject].append(teacher["ID"])
+
+        # Variable names only help when reading the model or the solver log, so skip building them otherwise
+        name_vars = logger.isEnabledFor(logging.DEBUG)
+        # Group the variables by constraint axis as they are created, rather than in a second pass over them
+        index = constraints.VariableIndex()
+        for class_ in self.data["classes"]:
+            if not any(room["Capacity"] >= class_["NumStudents"] for room in self.data["rooms"]):
+                logger.warning(f"No room fits the {class_['NumStudents']} students of class {class_['ID']}, "
+                               f"so it cannot be scheduled")
+                continue
+            class_vars = index.by_class[class_["ID"]]
+            for teacher_id in subject_teachers[class_["Subject"]]:
+                for time_slot in available_slots[teacher_id]:
+                    var = self.x[teacher_id, class_["ID"], time_slot] = self.model.NewBoolVar(
+                        f'{teacher_id}_{class_["ID"]}_{time_slot}' if name_vars else '')
+                    index.by_teacher_ts[teacher_id, time_slot].append(var)
+                    class_vars.append(var)
+                    index.by_class_ts[class_["ID"], time_slot].append(var)
+        self.var_index = index
         logger.info(f"Created {len(self.x)} decision variables")
 
     def apply_constraints(self):
@@ -76,83 +132,127 @@ class Scheduler:
         """
         logger.info("Applying constraints")
         constraints.apply_all_constraints(
-            self.solver,
-            self.x,
-            self.data["teachers"],
+            self.model,
+            self.var_index,
             self.data["classes"],
-            self.data["rooms"],
-            self.data["time_slots"]
+            self.data["rooms"]
         )
         logger.info("Constraints applied")
 
+    def build_model(self):
+        """
+        Create the decision variables and apply the constraints, unless this has already been done.
+
+        The model only depends on the input data, so a built scheduler can be re-solved with different
+        objective weights without rebuilding it.
+        """
+        if self.model_built:
+            logger.info("Model already built; skipping variable and constraint creation")
+            return
+        self.create_variables()
+        self.apply_constraints()
+        self.model_built = True
+
     def set_objective(self, weights: Dict[str, float]):
-        logger.info("Setting objective function")
-        log_memory_usage()
-        try:
-            objective = objectives.combined_objective(
-                self.x,
-                self.data["teachers"],
-                self.data["classes"],
-                self.data["rooms"],
-                self.data["time_slots"],
-                weights
-            )
-            logger.info("Objective created successfully")
-            log_memory_usage()
+        """
+        Set the weighted objective function.
+
+        The objective components are built on the first call only; later calls just re-weight them, so a
+        built model can be re-solved with new weights cheaply.
 
+        Args:
+            weights (Dict[str, float]): Weight for each objective component
+        """
+        logger.info("Setting objective function")
+        with log_phase("set_objective"):
             try:
-                self.solver.Minimize(objective)
-                logger.info("Objective function set successfully")
-                log_memory_usage()
+                if self.objective_terms is None:
+                    self.objective_terms = objectives.build_objective_terms(
+                        self.model,
+                        self.var_index,
+                        self.data["teachers"]
+                    )
+                objective = objectives.weighted_objective(self.objective_terms, weights)
+                logger.info("Objective created successfully")
+
+                try:
+                    self.model.Minimize(objective)
+                    logger.info("Objective function set successfully")
+                except Exception as e:
+                    logger.error(f"Error setting minimize objective: {str(e)}")
+                    logger.error(f"Traceback: {traceback.format_exc()}")
+                    raise
             except Exception as e:
-                logger.error(f"Error setting minimize objective: {str(e)}")
+                logger.error(f"Error setting objective function: {str(e)}")
                 logger.error(f"Traceback: {traceback.format_exc()}")
                 raise
-        except Exception as e:
-            logger.error(f"Error setting objective function: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            raise
 
         logger.info("Objective function setting completed")
-        log_memory_usage()
 
-    def solve(self, timeout: int = 300) -> bool:
-        logger.info(f"Starting to solve the scheduling problem with a {timeout} second timeout")
-        start_time = time.time()
+    def solve(self, timeout: int = 300, num_workers: Optional[int] = None,
+              solver_params: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Solve the scheduling problem.
+
+        Args:
+            timeout (int): Time limit for the solver, in seconds
+            num_workers (Optional[int]): Number of solver threads; defaults to the number of CPU cores
+            solver_params (Optional[Dict[str, Any]]): CP-SAT parameters to set, by SatParameters field name
+                (e.g. {"linearization_level": 0, "random_seed": 1})
+
+        Returns:
+            bool: True if an optimal or feasible solution was found
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        logger.info(f"Starting to solve the scheduling problem with a {timeout} second timeout "
+                    f"and {num_workers} workers")
+        self.status = None
         try:
             # Set a time limit for the solver
-            self.solver.set_time_limit(timeout * 1000)  # OR-Tools uses milliseconds
+            self.solver.parameters.max_time_in_seconds = timeout
+            self.solver.parameters.num_workers = num_workers
+            self.solver.parameters.log_search_progress = logger.isEnabledFor(logging.DEBUG)
+            for name, value in (solver_params or {}).items():
+                setattr(self.solver.parameters, name, value)
+
+            self.model.ClearHints()
+            if self.solution:
+                # Warm-start from the previous solution (e.g. when re-solving with new weights)
+                hint = self.solution
+            else:
+                # Cold start: hint a greedy schedule so the search starts close to a feasible solution
+                hint = heuristics.greedy_assignments(self.x, self.data["classes"], self.data["rooms"])
+                logger.info(f"Greedy hint assigns {len(hint)} periods")
+            for key, var in self.x.items():
+                self.model.AddHint(var, key in hint)
 
             logger.info("Calling solver.Solve()")
-            logger.info(f"Number of variables: {self.solver.NumVariables()}")
-            logger.info(f"Number of constraints: {self.solver.NumConstraints()}")
+            model_proto = self.model.Proto()
+            logger.info(f"Number of variables: {len(model_proto.variables)}")
+            logger.info(f"Number of constraints: {len(model_proto.constraints)}")
 
-            status = self.solver.Solve()
+            status = self.status = self.solver.Solve(self.model)
 
-            logger.info(f"Solver finished with status: {status}")
+            logger.info(f"Solver finished with status: {self.solver.StatusName(status)}")
 
-            end_time = time.time()
-            solve_time = end_time - start_time
-            logger.info(f"Solve process took {solve_time:.2f} seconds")
+            solve_time = self.solver.WallTime()  # Seconds, as measured by the solver
+            logger.info(f"Solver took {solve_time:.2f} seconds")
 
-            if status == pywraplp.Solver.OPTIMAL:
-                logger.info(f"Optimal solution found in {solve_time:.2f} seconds")
-                self.solution = {(t, c, r, ts): var.solution_value()
-                                 for (t, c, r, ts), var in self.x.items() if var.solution_value() > 0.5}
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                logger.info(f"{'Optimal' if status == cp_model.OPTIMAL else 'Feasible'} solution found "
+                            f"in {solve_time:.2f} seconds")
+                # One value read per variable; only the assignments that are made are kept
+                self.solution = {key: 1 for key, var in self.x.items() if self.solver.BooleanValue(var)}
                 return True
-            elif status == pywraplp.Solver.FEASIBLE:
-                logger.info(f"Feasible solution found in {solve_time:.2f} seconds")
-                self.solution = {(t, c, r, ts): var.solution_value()
-                                 for (t, c, r, ts), var in self.x.items() if var.solution_value() > 0.5}
-                return True
-            elif status == pywraplp.Solver.INFEASIBLE:
+            elif status == cp_model.INFEASIBLE:
                 logger.warning("Problem is infeasible")
                 return False
-            elif status == pywraplp.Solver.UNBOUNDED:
-                logger.warning("Problem is unbounded")
+            elif status == cp_model.MODEL_INVALID:
+                logger.warning(f"Model is invalid: {self.model.Validate()}")
                 return False
             else:
-                logger.warning(f"Solving process stopped with status: {status}")
+                logger.warning(f"Solving process stopped with status: {self.solver.StatusName(status)}")
                 return False
 
         except Exception as e:
@@ -162,7 +262,8 @@ class Scheduler:
 
     def get_schedule(self) -> Dict[int, List[Dict[str, Any]]]:
         """
-        Get the computed schedule in a structured format.
+        Get the computed schedule in a structured format, with rooms assigned to the lessons by
+        `heuristics.assign_rooms`.
 
         Returns:
             Dict[int, List[Dict[str, Any]]]: Schedule organized by day and period
@@ -170,18 +271,16 @@ class Scheduler:
         if not self.solution:
             raise ValueError("No solution available. Please run solve() first.")
 
+        room_of = heuristics.assign_rooms(self.solution, self.data["classes"], self.data["rooms"])
         schedule = {day: [] for day in range(5)}  # Assuming 5 days
-        for (teacher_id, class_id, room_id, (day, period)), value in self.solution.items():
+        for key, value in self.solution.items():
+            teacher_id, class_id, (day, period) = key
             if value > 0.5:
-                teacher = next(t for t in self.data["teachers"] if t["ID"] == teacher_id)
-                class_ = next(c for c in self.data["classes"] if c["ID"] == class_id)
-                room = next(r for r in self.data["rooms"] if r["ID"] == room_id)
-
                 schedule[day].append({
                     "period": period,
-                    "teacher": teacher["Name"],
-                    "class": class_["Subject"],
-                    "room": room["ID"]
+                    "teacher": self._teacher_by_id[teacher_id]["Name"],
+                    "class": self._class_by_id[class_id]["Subject"],
+                    "room": room_of[key]
                 })
 
         return schedule
@@ -191,17 +290,21 @@ class Scheduler:
         Print the computed schedule in a readable format.
         """
         schedule = self.get_schedule()
+        lines = []
         for day, classes in schedule.items():
-            print(f"Day {str(day + 1)}:")
-            for class_ in sorted(classes, key=lambda x: x["period"]):
-                print(f"  Period {class_['period'] + 1}: {class_['class']} - "
-                      f"Teacher: {class_['teacher']}, Room: {class_['room']}")
-            print()
+            lines.append(f"Day {str(day + 1)}:")
+            lines.extend(f"  Period {class_['period'] + 1}: {class_['class']} - "
+                         f"Teacher: {class_['teacher']}, Room: {class_['room']}"
+                         for class_ in sorted(classes, key=lambda x: x["period"]))
+            lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
     """
     Main function to run the school scheduling process.
+
+    Run from the project root as a module: `python -m src.scheduler`.
     """
     data_files = {
         "teachers_file": "data/teachers.csv",
@@ -217,8 +320,7 @@ def main():
     }
 
     scheduler = Scheduler(data_files)
-    scheduler.create_variables()
-    scheduler.apply_constraints()
+    scheduler.build_model()
     scheduler.set_objective(weights)
 
     if scheduler.solve():
@@ -6,23 +6,45 @@ both the Streamlit app and the script to run the scheduler automatically.
 """
 
 
+import multiprocessing
+import os
+import queue
 import traceback
-from typing import Dict, List, Any
-from scheduler import Scheduler
-from log_config import logger
+from typing import Dict, List, Any, Optional
+from ortools.sat.python import cp_model
+from .scheduler import Scheduler
+from .log_config import logger
 
+# CP-SAT parameter sets raced against each other in portfolio mode. Each changes something other than the seed
+# from the Scheduler's tuned defaults (linearization_level 0, optimize_with_core), which the first one keeps
+PORTFOLIO_CONFIGS = [
+    {},
+    {"random_seed": 1, "search_branching": cp_model.PORTFOLIO_SEARCH},
+    {"random_seed": 2, "optimize_with_core": False},
+    {"random_seed": 3, "linearization_level": 2},
+]
 
-def run_scheduler(scheduler: Scheduler, weights: Dict[str, float], timeout: int = 300) -> Dict[int, List[Dict[str, Any]]]:
-    """Run the scheduler with a timeout."""
+
+def run_scheduler(scheduler: Scheduler, weights: Dict[str, float], timeout: int = 300,
+                  num_workers: Optional[int] = None,
+                  solver_params: Optional[Dict[str, Any]] = None,
+                  portfolio: bool = False) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Run the scheduler with a timeout.
+
+    In portfolio mode, `scheduler` only supplies the data: the problem is solved with each of PORTFOLIO_CONFIGS
+    in parallel processes (sharing `num_workers` between them) and the first schedule found is returned.
+    `solver_params` is ignored in this mode.
+    """
+    if portfolio:
+        return run_portfolio(scheduler.data, weights, timeout=timeout, num_workers=num_workers)
     try:
-        logger.info("Creating variables")
-        scheduler.create_variables()
-        logger.info("Applying constraints")
-        scheduler.apply_constraints()
+        logger.info("Building model")
+        scheduler.build_model()
         logger.info("Setting objective")
         scheduler.set_objective(weights)
-        logger.info(f"Solving (timeout: {timeout} seconds)")
-        if scheduler.solve(timeout=timeout):
+        logger.info(f"Solving (timeout: {timeout} seconds, workers: {num_workers or 'all'})")
+        if scheduler.solve(timeout=timeout, num_workers=num_workers, solver_params=solver_params):
             logger.info("Solution found")
             return scheduler.get_schedule()
         else:
@@ -32,3 +54,55 @@ def run_scheduler(scheduler: Scheduler, weights: Dict[str, float], timeout: int
         logger.error(f"Error in run_scheduler: {str(e)}")
         logger.error(traceback.format_exc())
         return None
+
+
+def _solve_portfolio_member(data: Dict[str, Any], weights: Dict[str, float], timeout: int, num_workers: int,
+                            config: Dict[str, Any]) -> Optional[Dict[int, List[Dict[str, Any]]]]:
+    """Build and solve the model with one portfolio configuration (runs in a worker process)."""
+    scheduler = Scheduler(data)
+    return run_scheduler(scheduler, weights, timeout=timeout, num_workers=num_workers, solver_params=config)
+
+
+def run_portfolio(data: Dict[str, Any], weights: Dict[str, float], timeout: int = 300,
+                  num_workers: Optional[int] = None,
+                  configs: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[int, List[Dict[str, Any]]]]:
+    """
+    Solve the problem with several solver configurations in parallel and return the first schedule found.
+
+    Each configuration runs in its own process; the remaining processes are terminated as soon as one of them
+    returns a schedule.
+
+    Args:
+        data (Dict[str, Any]): Loaded scheduling data
+        weights (Dict[str, float]): Objective weights
+        timeout (int): Time limit for each solve, in seconds
+        num_workers (Optional[int]): Total number of solver threads, split between the configurations
+        configs (Optional[List[Dict[str, Any]]]): CP-SAT parameter sets (see `Scheduler.solve`); defaults to
+            PORTFOLIO_CONFIGS
+
+    Returns:
+        Optional[Dict[int, List[Dict[str, Any]]]]: The first schedule found, or None if no configuration found one
+    """
+    configs = configs or PORTFOLIO_CONFIGS
+    workers_per_config = max(1, (num_workers or os.cpu_count() or 1) // len(configs))
+    logger.info(f"Running solver portfolio with {len(configs)} configurations")
+
+    results = queue.Queue()
+    # Use fresh processes rather than forking a (possibly multi-threaded) parent
+    with multiprocessing.get_context("spawn").Pool(len(configs)) as pool:
+        for config in configs:
+            pool.apply_async(_solve_portfolio_member, (data, weights, timeout, workers_per_config, config),
+                             callback=lambda schedule, config=config: results.put((config, schedule)),
+                             error_callback=lambda error, config=config: results.put((config, None)))
+        for _ in configs:
+            try:
+                # A worker that dies (rather than raising) never reports back, so don't wait forever
+                config, schedule = results.get(timeout=timeout + 60)
+            except queue.Empty:
+                logger.warning("Timed out waiting for the solver portfolio")
+                break
+            if schedule is not None:
+                logger.info(f"Portfolio solution found by {config}")
+                return schedule  # Leaving the with-block terminates the other solvers
+    logger.info("No configuration in the portfolio found a solution")
+    return None
@@ -7,27 +7,63 @@ and other helper tasks.
 """
 
 import os
-from typing import Dict, List, Any, Tuple
-import csv
-import matplotlib.pyplot as plt
-import matplotlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Any, Tuple, TYPE_CHECKING
 import numpy as np
+import pandas as pd
 from collections import defaultdict
-import psutil
 
-matplotlib.use('Agg')
+try:
+    import resource
+except ImportError:  # Not available on Windows; fall back to psutil
+    resource = None
 
-from log_config import logger
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
+from .data_loader import NUM_DAYS, NUM_PERIODS
+from .log_config import logger
 
 # Configuration
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / 'data'
+OUTPUT_DIR = ROOT_DIR / 'output'
+
+def _pyplot():
+    """Import pyplot on first use, with the non-interactive Agg backend (pyplot is slow to import)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
 
 def ensure_dir_exists(directory):
     """Ensure that a directory exists, creating it if necessary."""
     if not os.path.exists(directory):
         os.makedirs(directory)
 
+def schedule_to_dataframe(schedule: Dict[int, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """
+    Flatten the schedule into a table with 1-based Day and Period columns, sorted by them and backed by Arrow
+    arrays. This is the table both shown on the Results page and exported to CSV.
+
+    Args:
+        schedule (Dict[int, List[Dict[str, Any]]]): The generated schedule
+
+    Returns:
+        pd.DataFrame: One row per scheduled class, with columns Day, Period, Class, Teacher and Room
+    """
+    rows = [(day + 1, class_['period'] + 1, class_['class'], class_['teacher'], class_['room'])
+            for day, classes in schedule.items() for class_ in classes]
+    return pd.DataFrame(rows, columns=['Day', 'Period', 'Class', 'Teacher', 'Room']).sort_values(
+        ['Day', 'Period'], ignore_index=True).convert_dtypes(dtype_backend='pyarrow')
+
+
 def export_schedule_to_csv(schedule: Dict[int, List[Dict[str, Any]]], filename: str) -> None:
     """
     Export the generated schedule to a CSV file in the output directory.
@@ -37,22 +73,9 @@ def export_schedule_to_csv(schedule: Dict[int, List[Dict[str, Any]]], filename:
         filename (str): The name of the file to save the schedule to
     """
     ensure_dir_exists(OUTPUT_DIR)
-    filepath = os.path.join(OUTPUT_DIR, filename)
-
-    with open(filepath, 'w', newline='') as csvfile:
-        fieldnames = ['Day', 'Period', 'Class', 'Teacher', 'Room']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-        writer.writeheader()
-        for day, classes in schedule.items():
-            for class_ in classes:
-                writer.writerow({
-                    'Day': day + 1,
-                    'Period': class_['period'] + 1,
-                    'Class': class_['class'],
-                    'Teacher': class_['teacher'],
-                    'Room': class_['room']
-                })
+    filepath = OUTPUT_DIR / filename
+
+    schedule_to_dataframe(schedule).to_csv(filepath, index=False)
     print(f"Schedule exported to {filepath}")
 
 def calculate_teacher_workload(schedule: Dict[int, List[Dict[str, Any]]]) -> Dict[str, int]:
@@ -71,7 +94,7 @@ def calculate_teacher_workload(schedule: Dict[int, List[Dict[str, Any]]]) -> Dic
             teacher_workload[class_['teacher']] += 1
     return dict(teacher_workload)
 
-def visualize_teacher_workload(schedule: Dict[int, List[Dict[str, Any]]]) -> plt.Figure:
+def visualize_teacher_workload(schedule: Dict[int, List[Dict[str, Any]]]) -> "plt.Figure":
     """
     Create a bar chart visualizing the workload distribution among teachers.
 
@@ -81,12 +104,21 @@ def visualize_teacher_workload(schedule: Dict[int, List[Dict[str, Any]]]) -> plt
     Returns:
         plt.Figure: The matplotlib figure object
     """
-    teacher_workload = calculate_teacher_workload(schedule)
-    teachers = list(teacher_workload.keys())
-    workloads = list(teacher_workload.values())
+    return plot_teacher_workload(calculate_teacher_workload(schedule))
+
+def plot_teacher_workload(teacher_workload: Dict[str, int]) -> "plt.Figure":
+    """
+    Create a bar chart of already computed teacher workloads (e.g. `ScheduleAnalytics.teacher_workload`).
+
+    Args:
+        teacher_workload (Dict[str, int]): Dictionary of the number of classes for each teacher
 
+    Returns:
+        plt.Figure: The matplotlib figure object
+    """
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 6))
-    ax.bar(teachers, workloads)
+    ax.bar(list(teacher_workload.keys()), list(teacher_workload.values()))
     ax.set_title('Teacher Workload Distribution')
     ax.set_xlabel('Teachers')
     ax.set_ylabel('Number of Classes')
@@ -140,10 +172,95 @@ def preprocess_time_slots(time_slots: List[tuple]) -> Dict[int, List[int]]:
         processed_slots[day].append(period)
     return dict(processed_slots)
 
+@lru_cache(maxsize=None)
+def _process():
+    """The psutil handle for this process, created once (only needed where `resource` is unavailable)."""
+    import psutil
+    return psutil.Process(os.getpid())
+
+def peak_memory_mb() -> float:
+    """Return the peak resident memory of this process in MB."""
+    if resource is None:
+        return _process().memory_info().peak_wset / 1024 / 1024
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return max_rss / 1024 / 1024 if sys.platform == "darwin" else max_rss / 1024
+
+
 def log_memory_usage():
-    process = psutil.Process(os.getpid())
-    mem_info = process.memory_info()
-    logger.info(f"Memory usage: {mem_info.rss / 1024 / 1024:.2f} MB")
+    logger.info(f"Peak memory usage: {peak_memory_mb():.2f} MB")
+
+
+@contextmanager
+def log_phase(name: str):
+    """
+    Log how long the block took and how much the peak memory grew, as a single line once it ends.
+
+    Args:
+        name (str): Name of the phase, used to label the log line
+    """
+    start_time = time.perf_counter()
+    start_memory = peak_memory_mb()
+    try:
+        yield
+    finally:
+        end_memory = peak_memory_mb()
+        logger.info(f"[{name}] took {time.perf_counter() - start_time:.2f}s, "
+                    f"peak memory {end_memory:.2f} MB (+{end_memory - start_memory:.2f} MB)")
+
+
+@contextmanager
+def sample_memory_usage(interval: float = 5.0):
+    """
+    Log memory usage every `interval` seconds on a background thread while the block runs, and once at the end.
+
+    Args:
+        interval (float): Seconds between samples
+    """
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            log_memory_usage()
+
+    thread = threading.Thread(target=sample, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+        log_memory_usage()
+
+
+def count_available_periods(availability: Any) -> int:
+    """
+    Count the periods a teacher is available for.
+
+    Args:
+        availability (Any): Either an availability string (e.g. '1,1,0,1;1,0,1,1'), a boolean array of shape
+            (days, periods) or a list of days, each a list of booleans or a comma-separated string
+
+    Returns:
+        int: Number of available periods
+    """
+    total_available_periods = 0
+    if isinstance(availability, np.ndarray):
+        # If availability is a boolean array of shape (days, periods)
+        total_available_periods = int(availability.sum())
+    elif isinstance(availability, str):
+        # If availability is a string (e.g., '1,1,0,1;1,0,1,1'), parse it
+        days = availability.split(';')
+        for day in days:
+            total_available_periods += sum(int(period) for period in day.split(','))
+    elif isinstance(availability, list):
+        # If availability is a list of lists
+        for day in availability:
+            if isinstance(day, list):
+                total_available_periods += sum(day)
+            elif isinstance(day, str):
+                total_available_periods += sum(int(period) for period in day.split(','))
+    return total_available_periods
 
 
 def calculate_teacher_utilization(schedule: Dict[int, List[Dict[str, Any]]], teachers: List[Dict[str, Any]],
@@ -164,22 +281,7 @@ def calculate_teacher_utilization(schedule: Dict[int, List[Dict[str, Any]]], tea
         scheduled_periods = sum(
             1 for day in schedule for class_ in schedule[day] if class_['teacher'] == teacher['Name'])
 
-        # Calculate total available periods
-        total_available_periods = 0
-        availability = teacher.get('Availability', '')
-        if isinstance(availability, str):
-            # If availability is a string (e.g., '1,1,0,1;1,0,1,1'), parse it
-            days = availability.split(';')
-            for day in days:
-                total_available_periods += sum(int(period) for period in day.split(','))
-        elif isinstance(availability, list):
-            # If availability is a list of lists
-            for day in availability:
-                if isinstance(day, list):
-                    total_available_periods += sum(day)
-                elif isinstance(day, str):
-                    total_available_periods += sum(int(period) for period in day.split(','))
-
+        total_available_periods = count_available_periods(teacher.get('Availability', ''))
         if total_available_periods == 0:
             utilization[teacher['Name']] = 0
         else:
@@ -187,7 +289,7 @@ def calculate_teacher_utilization(schedule: Dict[int, List[Dict[str, Any]]], tea
 
     return utilization
 
-def plot_teacher_utilization(utilization: Dict[str, float]) -> plt.Figure:
+def plot_teacher_utilization(utilization: Dict[str, float]) -> "plt.Figure":
     """
     Create a bar chart of teacher utilization.
 
@@ -197,6 +299,7 @@ def plot_teacher_utilization(utilization: Dict[str, float]) -> plt.Figure:
     Returns:
         plt.Figure: The matplotlib figure object
     """
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 6))
     ax.bar(utilization.keys(), utilization.values())
     ax.set_title('Teacher Utilization')
@@ -217,13 +320,15 @@ def analyze_class_distribution(schedule: Dict[int, List[Dict[str, Any]]], teache
     Returns:
         Dict[str, List[int]]: Dictionary of class distribution for each teacher
     """
-    distribution = {teacher['Name']: [0] * 5 for teacher in teachers}  # Assuming 5 days
-    for day, classes in schedule.items():
-        for class_ in classes:
-            distribution[class_['teacher']][day] += 1
-    return distribution
-
-def plot_class_distribution(distribution: Dict[str, List[int]]) -> plt.Figure:
+    rows = {teacher['Name']: i for i, teacher in enumerate(teachers)}
+    # At least NUM_DAYS columns, more if the time slots data has more days
+    counts = np.zeros((len(rows), max(NUM_DAYS, max(schedule, default=0) + 1)), dtype=np.int32)
+    lessons = [(rows[class_['teacher']], day) for day, classes in schedule.items() for class_ in classes]
+    if lessons:
+        np.add.at(counts, tuple(zip(*lessons)), 1)
+    return dict(zip(rows, counts.tolist()))
+
+def plot_class_distribution(distribution: Dict[str, List[int]]) -> "plt.Figure":
     """
     Create a stacked bar chart of class distribution across the week for each teacher.
 
@@ -233,12 +338,16 @@ def plot_class_distribution(distribution: Dict[str, List[int]]) -> plt.Figure:
     Returns:
         plt.Figure: The matplotlib figure object
     """
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 6))
-    bottom = np.zeros(len(distribution))
-    for day in range(5):
-        values = [dist[day] for dist in distribution.values()]
-        ax.bar(distribution.keys(), values, bottom=bottom, label=f'Day {day+1}')
-        bottom += values
+    if distribution:
+        counts = np.array(list(distribution.values()), dtype=int)  # (teachers, days)
+    else:
+        counts = np.zeros((0, NUM_DAYS), dtype=int)
+    bottoms = np.cumsum(counts, axis=1) - counts  # Each day's bar starts on top of the days before it
+    teachers = list(distribution.keys())
+    for day in range(counts.shape[1]):
+        ax.bar(teachers, counts[:, day], bottom=bottoms[:, day], label=f'Day {day+1}')
     ax.set_title('Distribution of Classes Across the Week')
     ax.legend(title='Days')
     ax.set_xlabel('Teachers')
@@ -258,16 +367,28 @@ def analyze_gaps(schedule: Dict[int, List[Dict[str, Any]]], teachers: List[Dict[
     Returns:
         Dict[str, int]: Dictionary of gap counts for each teacher
     """
-    gaps = {teacher['Name']: 0 for teacher in teachers}
-    for day, classes in schedule.items():
-        day_schedule = {teacher['Name']: [0] * 8 for teacher in teachers}  # Assuming 8 periods
-        for class_ in classes:
-            day_schedule[class_['teacher']][class_['period']] = 1
-        for teacher, periods in day_schedule.items():
-            gaps[teacher] += sum(1 for i in range(1, 7) if periods[i] == 0 and periods[i-1] == 1 and periods[i+1] == 1)
-    return gaps
+    return _count_gaps([(class_['teacher'], day, class_['period']) for day, classes in schedule.items()
+                        for class_ in classes], [teacher['Name'] for teacher in teachers])
+
 
-def plot_teacher_gaps(teacher_gaps: Dict[str, int]) -> plt.Figure:
+def _count_gaps(lessons: List[Tuple[str, int, int]], teacher_names: List[str]) -> Dict[str, int]:
+    """
+    Count each teacher's gaps (empty periods with lessons either side) from their (teacher, day, period) lessons.
+
+    The lessons are marked in a (teacher, day, period) occupancy array, so the gaps of all teachers and days are
+    found with one set of array comparisons. Teachers in the schedule but not in `teacher_names` are counted too.
+    The array grows past NUM_DAYS x NUM_PERIODS if the time slots data has more days or periods.
+    """
+    rows = {name: i for i, name in enumerate(teacher_names)}
+    lesson_rows = [rows.setdefault(teacher, len(rows)) for teacher, _, _ in lessons]
+    _, days, periods = zip(*lessons) if lessons else ((), (), ())
+    occupied = np.zeros((len(rows), max(NUM_DAYS, max(days, default=0) + 1),
+                         max(NUM_PERIODS, max(periods, default=0) + 1)), dtype=bool)
+    occupied[lesson_rows, days, periods] = True
+    gaps = ~occupied[:, :, 1:-1] & occupied[:, :, :-2] & occupied[:, :, 2:]
+    return dict(zip(rows, gaps.sum(axis=(1, 2)).tolist()))
+
+def plot_teacher_gaps(teacher_gaps: Dict[str, int]) -> "plt.Figure":
     """
     Create a bar chart of gaps in teacher schedules.
 
@@ -277,6 +398,7 @@ def plot_teacher_gaps(teacher_gaps: Dict[str, int]) -> plt.Figure:
     Returns:
         plt.Figure: The matplotlib figure object
     """
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 6))
     ax.bar(teacher_gaps.keys(), teacher_gaps.values())
     ax.set_title('Number of Gaps in Teacher Schedules')
@@ -305,7 +427,7 @@ def calculate_room_utilization(schedule: Dict[int, List[Dict[str, Any]]], rooms:
             utilization[class_['room']] += 1
     return {room: (count / total_periods) * 100 for room, count in utilization.items()}
 
-def plot_room_utilization(room_utilization: Dict[str, float]) -> plt.Figure:
+def plot_room_utilization(room_utilization: Dict[str, float]) -> "plt.Figure":
     """
     Create a bar chart of room utilization.
 
@@ -315,6 +437,7 @@ def plot_room_utilization(room_utilization: Dict[str, float]) -> plt.Figure:
     Returns:
         plt.Figure: The matplotlib figure object
     """
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 6))
     ax.bar(room_utilization.keys(), room_utilization.values())
     ax.set_title('Room Utilization')
@@ -341,7 +464,7 @@ def analyze_subject_balance(schedule: Dict[int, List[Dict[str, Any]]], classes:
             subject_count[class_['class']] += 1
     return subject_count
 
-def plot_subject_balance(subject_balance: Dict[str, int]) -> plt.Figure:
+def plot_subject_balance(subject_balance: Dict[str, int]) -> "plt.Figure":
     """
     Create a bar chart of subject distribution.
 
@@ -351,6 +474,7 @@ def plot_subject_balance(subject_balance: Dict[str, int]) -> plt.Figure:
     Returns:
         plt.Figure: The matplotlib figure object
     """
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 6))
     ax.bar(subject_balance.keys(), subject_balance.values())
     ax.set_title('Distribution of Subjects')
@@ -360,6 +484,85 @@ def plot_subject_balance(subject_balance: Dict[str, int]) -> plt.Figure:
     plt.tight_layout()
     return fig
 
+@dataclass
+class ScheduleAnalytics:
+    """Results of all the schedule analyses, as returned by the individual analysis functions."""
+    teacher_workload: Dict[str, int]
+    teacher_utilization: Dict[str, float]
+    class_distribution: Dict[str, List[int]]
+    teacher_gaps: Dict[str, int]
+    room_utilization: Dict[str, float]
+    subject_balance: Dict[str, int]
+    statistics: Dict[str, Any]
+
+
+def compute_all_analytics(schedule: Dict[int, List[Dict[str, Any]]], teachers: List[Dict[str, Any]],
+                          classes: List[Dict[str, Any]], rooms: List[Dict[str, Any]],
+                          time_slots: List[Tuple[int, int]]) -> ScheduleAnalytics:
+    """
+    Compute all the schedule analyses in a single pass over the schedule.
+
+    Equivalent to calling calculate_teacher_workload, calculate_teacher_utilization, analyze_class_distribution,
+    analyze_gaps, calculate_room_utilization, analyze_subject_balance and calculate_schedule_statistics separately.
+
+    Args:
+        schedule (Dict[int, List[Dict[str, Any]]]): The generated schedule
+        teachers (List[Dict[str, Any]]): List of teacher dictionaries
+        classes (List[Dict[str, Any]]): List of class dictionaries
+        rooms (List[Dict[str, Any]]): List of room dictionaries
+        time_slots (List[Tuple[int, int]]): List of time slots
+
+    Returns:
+        ScheduleAnalytics: The results of all the analyses
+    """
+    teacher_workload = defaultdict(int)
+    num_days = max(NUM_DAYS, max(schedule, default=0) + 1)  # As in analyze_class_distribution
+    distribution = {teacher['Name']: [0] * num_days for teacher in teachers}
+    lessons = []  # (teacher, day, period), for counting gaps
+    room_counts = {room['ID']: 0 for room in rooms}
+    subject_count = {class_['Subject']: 0 for class_ in classes}
+    classes_per_day = {}
+
+    for day, day_classes in schedule.items():
+        classes_per_day[day] = len(day_classes)
+        for class_ in day_classes:
+            teacher = class_['teacher']
+            teacher_workload[teacher] += 1
+            distribution.setdefault(teacher, [0] * num_days)[day] += 1
+            lessons.append((teacher, day, class_['period']))
+            room_counts[class_['room']] = room_counts.get(class_['room'], 0) + 1
+            subject_count[class_['class']] = subject_count.get(class_['class'], 0) + 1
+
+    teacher_utilization = {}
+    for teacher in teachers:
+        total_available_periods = count_available_periods(teacher.get('Availability', ''))
+        scheduled_periods = teacher_workload.get(teacher['Name'], 0)
+        teacher_utilization[teacher['Name']] = (
+            0 if total_available_periods == 0 else (scheduled_periods / total_available_periods) * 100)
+
+    total_classes = sum(classes_per_day.values())
+    statistics = {
+        'total_classes': total_classes,
+        'classes_per_day': classes_per_day,
+        'teacher_workload': dict(teacher_workload),
+        'room_utilization': {room: count for room, count in room_counts.items() if count},
+        'avg_classes_per_day': total_classes / len(schedule) if schedule else 0,
+        'max_teacher_workload': max(teacher_workload.values(), default=0),
+        'min_teacher_workload': min(teacher_workload.values(), default=0),
+    }
+
+    total_periods = len(time_slots)
+    return ScheduleAnalytics(
+        teacher_workload=dict(teacher_workload),
+        teacher_utilization=teacher_utilization,
+        class_distribution=distribution,
+        teacher_gaps=_count_gaps(lessons, [teacher['Name'] for teacher in teachers]),
+        room_utilization={room: (count / total_periods) * 100 for room, count in room_counts.items()},
+        subject_balance=subject_count,
+        statistics=statistics
+    )
+
+
 if __name__ == "__main__":
     # Example usage of the utility functions
     sample_schedule = {